@@ -22,6 +22,14 @@ def env_bool(name: str, default: bool = False) -> bool:
     return raw.lower() in {"true", "yes", "1"}
 
 
+def env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+
+    return int(raw)
+
+
 def env_list(name: str, separator: str = ",") -> list[str]:
     raw = os.getenv(name)
     if not raw:
@@ -73,6 +81,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "brackets.middleware.ReplicaPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -113,18 +122,64 @@ if env_bool("BE_DEV_EPHEMERAL_DB"):
             "NAME": ":memory:",
         }
     }
+
+    if env_bool("BE_DEV_EPHEMERAL_REPLICA"):
+        # A second alias for the same shared in-memory database stands in for a
+        # replica, so replica routing can be exercised locally without Postgres.
+        DATABASES["default"]["NAME"] = "file:bracket_explorer?mode=memory&cache=shared"
+        DATABASES["replica_1"] = {
+            **DATABASES["default"],
+            "TEST": {"MIRROR": "default"},
+        }
 else:
-    DATABASES = {
-        "default": {
+
+    def postgres_database(host: str | None) -> dict:
+        database = {
             "ENGINE": "django.db.backends.postgresql",
             "NAME": os.getenv("BE_DB_NAME"),
             "USER": os.getenv("BE_DB_USER"),
             "PASSWORD": os.getenv("BE_DB_PASSWORD"),
-            "HOST": os.getenv("BE_DB_HOST"),
+            "HOST": host,
             "PORT": os.getenv("BE_DB_PORT"),
+            # Check connections are still alive before handing them out. Persistent
+            # connections are checked by Django when a request reuses them. Django
+            # marks pooled connections as checked whenever it takes one, so for those
+            # this instead makes the pool run `ConnectionPool.check_connection`
+            # (Django 5.1.1 and later).
+            "CONN_HEALTH_CHECKS": True,
+        }
+
+        if env_bool("BE_DB_POOL", default=True):
+            # Pooled connections are reused across requests, so they must not also
+            # be persisted by Django.
+            database["CONN_MAX_AGE"] = 0
+            database["OPTIONS"] = {
+                "pool": {
+                    "min_size": env_int("BE_DB_POOL_MIN_SIZE", 2),
+                    "max_size": env_int("BE_DB_POOL_MAX_SIZE", 10),
+                    "timeout": env_int("BE_DB_POOL_TIMEOUT", 10),
+                }
+            }
+        else:
+            database["CONN_MAX_AGE"] = env_int("BE_DB_CONN_MAX_AGE", 60)
+
+        return database
+
+    DATABASES = {"default": postgres_database(os.getenv("BE_DB_HOST"))}
+
+    for i, host in enumerate(env_list("BE_DB_REPLICA_HOSTS"), start=1):
+        DATABASES[f"replica_{i}"] = {
+            **postgres_database(host),
+            "TEST": {"MIRROR": "default"},
         }
-    }
 
+# Reads of read-heavy models are spread across the replicas. See `brackets.routers`.
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["brackets.routers.ReplicaRouter"]
+
+# How long a client reads from the primary after writing, which should comfortably
+# exceed replication lag.
+DATABASE_REPLICA_PIN_SECONDS = env_int("BE_DB_REPLICA_PIN_SECONDS", 15)
 
 AUTH_USER_MODEL = "brackets.User"
 
@@ -202,6 +257,21 @@ LOGGING = {
 }
 
 
+# Predictions
+
+# Path to a probability table produced by the `calibrate_probabilities` command. The
+# built-in table is used if this isn't set.
+BE_WIN_PROBABILITIES_PATH = os.getenv("BE_WIN_PROBABILITIES_PATH")
+
+
+# Live updates
+
+# Unix socket of the broker started by the `run_event_broker` command. Live updates
+# are only delivered within the publishing process if this isn't set, which is enough
+# for a single worker but never reaches browsers from the `record_result` command.
+BE_EVENT_BROKER_SOCKET = os.getenv("BE_EVENT_BROKER_SOCKET")
+
+
 # Allauth
 
 ACCOUNT_AUTHENTICATION_METHOD = "email"
@@ -1,6 +1,58 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
 
-from brackets import models
+from brackets import models, pagination
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Change list that pages with a keyset cursor instead of page numbers.
+
+    Page links use the cursor in the query string, and the result count is the
+    planner's estimate rather than an exact count.
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(pagination.CURSOR_VAR, None)
+
+        return lookup_params
+
+    def get_results(self, request):
+        try:
+            page = pagination.paginate(
+                self.queryset,
+                request.GET.get(pagination.CURSOR_VAR),
+                self.list_per_page,
+            )
+        except ValueError:
+            raise IncorrectLookupParameters
+
+        self.result_count = pagination.estimated_count(self.queryset)
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = page.object_list
+        self.can_show_all = False
+        # Page number links are replaced by cursor links in the pagination template.
+        self.multi_page = False
+        self.paginator = None
+
+        cursor_var = pagination.CURSOR_VAR
+        self.first_page_url = (
+            self.get_query_string(remove=[cursor_var]) if page.previous_cursor else None
+        )
+        self.previous_page_url = (
+            self.get_query_string({cursor_var: page.previous_cursor})
+            if page.previous_cursor
+            else None
+        )
+        self.next_page_url = (
+            self.get_query_string({cursor_var: page.next_cursor})
+            if page.next_cursor
+            else None
+        )
 
 
 @admin.register(models.User)
@@ -11,5 +63,13 @@ class UserAdmin(admin.ModelAdmin):
 @admin.register(models.Bracket)
 class BracketAdmin(admin.ModelAdmin):
     list_display = ("name", "owner", "created_at", "updated_at")
+    list_select_related = ("owner",)
     fields = ("id", "name", "owner", "random_seed", "created_at", "updated_at")
     readonly_fields = ("id", "created_at", "updated_at")
+    raw_id_fields = ("owner",)
+    show_full_result_count = False
+    # Keyset pagination requires a fixed ordering.
+    sortable_by = ()
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
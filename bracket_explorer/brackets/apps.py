@@ -1,6 +1,16 @@
+from pathlib import Path
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BracketsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "brackets"
+
+    def ready(self):
+        from brackets import prediction_engine, signals  # noqa: F401
+
+        if settings.BE_WIN_PROBABILITIES_PATH:
+            path = Path(settings.BE_WIN_PROBABILITIES_PATH)
+            prediction_engine.set_active_model(prediction_engine.load_model(path))
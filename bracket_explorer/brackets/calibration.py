@@ -0,0 +1,254 @@
+"""
+Fit win probabilities from historical tournament results.
+
+The prediction engine decides each game using the probability that the worse seed in
+the matchup wins, looked up by round and seed. This module estimates those
+probabilities from past games.
+
+Raw win rates are noisy because some seeds rarely reach later rounds, so each round's
+rates are shrunk toward a smooth logistic curve over seeds fit by maximum likelihood.
+Only per-cell game and win counts are needed to refit, so appending a new season just
+adds its counts to the stored ones.
+"""
+
+import csv
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from brackets.prediction_engine import Round
+
+NUM_SEEDS = 16
+ROUNDS = [round for round in Round if round >= Round.ROUND_OF_64]
+COLUMNS = ("season", "round", "winner_seed", "loser_seed")
+
+# Number of pseudo-games the fitted curve is worth when shrinking a cell's win rate.
+DEFAULT_PRIOR_STRENGTH = 8.0
+
+# L2 penalty keeping the logistic fit finite for rounds with little or one-sided data.
+RIDGE_PENALTY = 1e-3
+
+NEWTON_ITERATIONS = 50
+
+# Fitted probabilities are kept this far from 0 and 1. One-sided history, such as a
+# round where the worse seed never won, would otherwise make games certain.
+MIN_PROBABILITY = 1e-3
+
+
+@dataclass
+class GameResults:
+    """
+    Historical games as parallel arrays.
+    """
+
+    seasons: np.ndarray
+    rounds: np.ndarray
+    winner_seeds: np.ndarray
+    loser_seeds: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.seasons)
+
+    def for_seasons(self, seasons: set[int]) -> "GameResults":
+        mask = np.isin(self.seasons, list(seasons))
+
+        return GameResults(
+            seasons=self.seasons[mask],
+            rounds=self.rounds[mask],
+            winner_seeds=self.winner_seeds[mask],
+            loser_seeds=self.loser_seeds[mask],
+        )
+
+
+def read_results(path: Path) -> GameResults:
+    """
+    Read historical games from a CSV file.
+
+    The file must have a header row with the columns ``season``, ``round``,
+    ``winner_seed`` and ``loser_seed``. Rounds are numbered from 1 for the round of 64
+    through 6 for the championship.
+
+    :raises ValueError: If a column is missing, or a row has a value that isn't a whole
+        number or an invalid round or seed. The message names the offending line.
+    """
+    rows = []
+    with path.open(newline="") as f:
+        reader = csv.DictReader(f)
+        missing = [
+            column for column in COLUMNS if column not in (reader.fieldnames or [])
+        ]
+        if missing:
+            raise ValueError(f"{path} is missing columns: {', '.join(missing)}.")
+
+        for row in reader:
+            rows.append(parse_row(row, f"{path}, line {reader.line_num}"))
+
+    data = np.array(rows, dtype=np.int64).reshape(-1, 4)
+
+    return GameResults(*data.T)
+
+
+def parse_row(row: dict[str, str | None], location: str) -> tuple[int, ...]:
+    try:
+        season, round, winner_seed, loser_seed = (
+            int(row[column]) for column in COLUMNS
+        )
+    except (TypeError, ValueError):
+        raise ValueError(f"{location}: expected whole numbers, got {row!r}.") from None
+
+    if not 1 <= round <= len(ROUNDS):
+        raise ValueError(f"{location}: unknown round {round}.")
+
+    for seed in (winner_seed, loser_seed):
+        if not 1 <= seed <= NUM_SEEDS:
+            raise ValueError(f"{location}: seed {seed} is outside of 1-{NUM_SEEDS}.")
+
+    return season, round, winner_seed, loser_seed
+
+
+def count_games(results: GameResults) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Tally games and wins for the worse seed of each game by round and seed.
+
+    When both teams have the same seed, the game counts as half a win since either
+    team could be considered the worse seed.
+
+    :returns: Arrays of games played and games won with shape ``(rounds, seeds)``.
+    """
+    underdogs = np.maximum(results.winner_seeds, results.loser_seeds)
+    wins = np.select(
+        [
+            results.winner_seeds > results.loser_seeds,
+            results.winner_seeds == results.loser_seeds,
+        ],
+        [1.0, 0.5],
+        default=0.0,
+    )
+
+    cells = (results.rounds - 1) * NUM_SEEDS + (underdogs - 1)
+    size = len(ROUNDS) * NUM_SEEDS
+    shape = (len(ROUNDS), NUM_SEEDS)
+
+    return (
+        np.bincount(cells, minlength=size).astype(np.float64).reshape(shape),
+        np.bincount(cells, weights=wins, minlength=size).reshape(shape),
+    )
+
+
+def fit_curves(games: np.ndarray, wins: np.ndarray) -> np.ndarray:
+    """
+    Fit a logistic curve over seeds for every round at once.
+
+    Each round's win probability is modeled as ``sigmoid(a + b * seed)``, with the
+    parameters found by Newton's method on the binomial likelihood of the counts. All
+    rounds are solved together with batched linear algebra.
+
+    :returns: The fitted probability for each round and seed.
+    """
+    seeds = (np.arange(NUM_SEEDS) + 1.0) / NUM_SEEDS
+    features = np.stack([np.ones(NUM_SEEDS), seeds], axis=1)
+    params = np.zeros((len(games), 2))
+    ridge = RIDGE_PENALTY * np.eye(2)
+
+    for _ in range(NEWTON_ITERATIONS):
+        fitted = 1.0 / (1.0 + np.exp(-params @ features.T))
+        gradient = (wins - games * fitted) @ features - RIDGE_PENALTY * params
+        weights = games * fitted * (1.0 - fitted)
+        hessian = np.einsum("rs,si,sj->rij", weights, features, features) + ridge
+        step = np.linalg.solve(hessian, gradient[..., None])[..., 0]
+        params += step
+
+        if np.max(np.abs(step)) < 1e-10:
+            break
+
+    return 1.0 / (1.0 + np.exp(-params @ features.T))
+
+
+def shrink(
+    games: np.ndarray, wins: np.ndarray, curves: np.ndarray, strength: float
+) -> np.ndarray:
+    """
+    Blend observed win rates with fitted curves.
+
+    This is the posterior mean of a beta prior centered on the curve and worth
+    ``strength`` games, so cells with few games stay close to the curve.
+    """
+    return (wins + strength * curves) / (games + strength)
+
+
+def empty_counts() -> np.ndarray:
+    return np.zeros((len(ROUNDS), NUM_SEEDS))
+
+
+@dataclass
+class Calibration:
+    """
+    Accumulated game counts and the probabilities fit from them.
+    """
+
+    version: int = 0
+    seasons: list[int] = field(default_factory=list)
+    prior_strength: float = DEFAULT_PRIOR_STRENGTH
+    games: np.ndarray = field(default_factory=empty_counts)
+    wins: np.ndarray = field(default_factory=empty_counts)
+
+    def add_results(self, results: GameResults) -> list[int]:
+        """
+        Add the games from any seasons that haven't been counted yet.
+
+        :returns: The newly added seasons.
+        """
+        new_seasons = set(np.unique(results.seasons).tolist()) - set(self.seasons)
+        if not new_seasons:
+            return []
+
+        games, wins = count_games(results.for_seasons(new_seasons))
+        self.games = self.games + games
+        self.wins = self.wins + wins
+        self.seasons = sorted([*self.seasons, *new_seasons])
+        self.version += 1
+
+        return sorted(new_seasons)
+
+    def probabilities(self) -> np.ndarray:
+        curves = fit_curves(self.games, self.wins)
+        probabilities = shrink(self.games, self.wins, curves, self.prior_strength)
+
+        return np.clip(probabilities, MIN_PROBABILITY, 1 - MIN_PROBABILITY)
+
+    def save(self, path: Path) -> None:
+        """
+        Write the calibration as a table the prediction engine can load.
+        """
+        probabilities = self.probabilities()
+        data = {
+            "version": self.version,
+            "seasons": self.seasons,
+            "prior_strength": self.prior_strength,
+            "games": self.games.tolist(),
+            "wins": self.wins.tolist(),
+            "probabilities": {
+                round.name: [round_to(p) for p in probabilities[i]]
+                for i, round in enumerate(ROUNDS)
+            },
+        }
+
+        path.write_text(json.dumps(data, indent=2))
+
+    @classmethod
+    def load(cls, path: Path) -> "Calibration":
+        data = json.loads(path.read_text())
+
+        return cls(
+            version=data["version"],
+            seasons=data["seasons"],
+            prior_strength=data["prior_strength"],
+            games=np.array(data["games"], dtype=np.float64),
+            wins=np.array(data["wins"], dtype=np.float64),
+        )
+
+
+def round_to(probability: float, digits: int = 4) -> float:
+    return round(float(probability), digits)
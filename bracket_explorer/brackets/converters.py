@@ -0,0 +1,14 @@
+class BracketCodeConverter:
+    """
+    Match bracket codes from :func:`brackets.encoding.encode`.
+
+    Codes of the right shape can still be invalid, which the view has to check.
+    """
+
+    regex = "[A-Za-z0-9_-]+"
+
+    def to_python(self, value: str) -> str:
+        return value
+
+    def to_url(self, value: str) -> str:
+        return value
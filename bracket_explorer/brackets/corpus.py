@@ -0,0 +1,245 @@
+"""
+Columnar storage of saved brackets for offline analysis.
+
+A corpus is a directory holding one raw binary file per column and a manifest
+describing them. The winners column is a fixed-width matrix with one row per bracket
+and one column per game, holding the index of the team that won the game. Because the
+columns are plain arrays, they can be memory-mapped and analyzed in chunks without a
+database or loading the whole corpus into memory.
+"""
+
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+import numpy as np
+
+from brackets.prediction_engine import game_rounds
+
+FORMAT_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+
+# The number of brackets analyzed at once when scanning a corpus.
+DEFAULT_CHUNK_SIZE = 100_000
+
+COLUMNS = {
+    "id": np.dtype("S16"),
+    "owner_id": np.dtype("S16"),
+    "created_at": np.dtype("datetime64[us]"),
+    "random_seed": np.dtype("int64"),
+    "winners": np.dtype("uint8"),
+}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def to_microseconds(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+class CorpusWriter:
+    """
+    Append brackets to a corpus directory in chunks.
+
+    The manifest is only written once the writer is closed successfully, so an
+    interrupted export never looks like a complete corpus.
+
+    :param probability_model: The version of the probability model the winners were
+        simulated under, which is recorded in the manifest.
+    """
+
+    def __init__(self, path: Path, num_games: int, probability_model: str):
+        self.path = path
+        self.num_games = num_games
+        self.probability_model = probability_model
+        self.num_rows = 0
+
+        path.mkdir(parents=True, exist_ok=True)
+        (path / MANIFEST_NAME).unlink(missing_ok=True)
+
+        self.files = {name: open(path / f"{name}.bin", "wb") for name in COLUMNS}
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.close_files()
+
+    def write(self, columns: dict[str, np.ndarray]) -> None:
+        """
+        Append a chunk of brackets.
+
+        :param columns: A map of column names to arrays with one entry per bracket.
+        """
+        winners = columns["winners"]
+        num_rows = len(winners)
+        if winners.ndim != 2 or winners.shape[1] != self.num_games:
+            raise ValueError(
+                f"Expected winners with {self.num_games} games, got {winners.shape}."
+            )
+
+        for name, dtype in COLUMNS.items():
+            values = np.ascontiguousarray(columns[name], dtype=dtype)
+            if len(values) != num_rows:
+                raise ValueError(
+                    f"Column {name!r} has {len(values)} rows, expected {num_rows}."
+                )
+
+            values.tofile(self.files[name])
+
+        self.num_rows += num_rows
+
+    def close_files(self) -> None:
+        for file in self.files.values():
+            file.close()
+
+    def close(self) -> None:
+        self.close_files()
+
+        manifest = {
+            "version": FORMAT_VERSION,
+            "num_rows": self.num_rows,
+            "num_games": self.num_games,
+            "probability_model": self.probability_model,
+            "columns": {name: dtype.str for name, dtype in COLUMNS.items()},
+        }
+        (self.path / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+
+
+@dataclass
+class BracketCorpus:
+    """
+    A memory-mapped corpus of brackets.
+
+    Winners depend on the probability model as well as the seeds, so a corpus only
+    describes the current brackets while ``probability_model`` matches the active
+    model's version.
+    """
+
+    num_games: int
+    probability_model: str
+    id: np.ndarray
+    owner_id: np.ndarray
+    created_at: np.ndarray
+    random_seed: np.ndarray
+    winners: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.winners)
+
+    @property
+    def num_teams(self) -> int:
+        return self.num_games + 1
+
+    def chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[slice]:
+        for start in range(0, len(self), chunk_size):
+            yield slice(start, start + chunk_size)
+
+    def pick_counts(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+        """
+        Count how many brackets picked each team to win each game.
+
+        :returns: An array of shape ``(num_games, num_teams)``.
+        """
+        offsets = np.arange(self.num_games, dtype=np.int64) * self.num_teams
+        counts = np.zeros(self.num_games * self.num_teams, dtype=np.int64)
+
+        for chunk in self.chunks(chunk_size):
+            cells = self.winners[chunk].astype(np.int64) + offsets
+            counts += np.bincount(cells.ravel(), minlength=len(counts))
+
+        return counts.reshape(self.num_games, self.num_teams)
+
+    def round_pick_counts(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+        """
+        Count how many brackets picked each team to win a game in each round.
+
+        :returns: An array of shape ``(num_rounds + 1, num_teams)`` indexed by round
+            number, so row 0 is always empty.
+        """
+        rounds = game_rounds(self.num_games)
+        counts = np.zeros((rounds.max() + 1, self.num_teams), dtype=np.int64)
+        np.add.at(counts, rounds, self.pick_counts(chunk_size))
+
+        return counts
+
+    def similarity(
+        self, winners: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> np.ndarray:
+        """
+        Count the games each bracket picked the same as the given bracket.
+
+        :param winners: The winner of each game in the bracket to compare against.
+        :returns: The number of matching picks for each bracket in the corpus.
+        """
+        matches = np.empty(len(self), dtype=np.int64)
+        for chunk in self.chunks(chunk_size):
+            matches[chunk] = (self.winners[chunk] == winners).sum(axis=1)
+
+        return matches
+
+    def score(
+        self,
+        results: np.ndarray,
+        points_per_round: np.ndarray,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> np.ndarray:
+        """
+        Score every bracket against actual results.
+
+        :param results: The winner of each game, or -1 for games that have not been
+            played yet.
+        :param points_per_round: Points for a correct pick, indexed by round number.
+        :returns: The score of each bracket in the corpus.
+        """
+        points = np.asarray(points_per_round)[game_rounds(self.num_games)]
+        points = np.where(np.asarray(results) < 0, 0, points)
+
+        scores = np.empty(len(self), dtype=np.int64)
+        for chunk in self.chunks(chunk_size):
+            scores[chunk] = (self.winners[chunk] == results) @ points
+
+        return scores
+
+
+def load_corpus(path: Path) -> BracketCorpus:
+    """
+    Memory-map a corpus written by :class:`CorpusWriter`.
+
+    :raises ValueError: If the corpus is incomplete or uses an unknown format.
+    """
+    manifest_path = path / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise ValueError(f"{path} is not a complete bracket corpus.")
+
+    manifest = json.loads(manifest_path.read_text())
+    if manifest["version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported corpus version {manifest['version']}.")
+
+    num_rows, num_games = manifest["num_rows"], manifest["num_games"]
+    columns = {}
+    for name, dtype in COLUMNS.items():
+        shape = (num_rows, num_games) if name == "winners" else (num_rows,)
+        if num_rows == 0:
+            # Empty files can't be memory-mapped.
+            columns[name] = np.empty(shape, dtype=dtype)
+        else:
+            columns[name] = np.memmap(
+                path / f"{name}.bin", dtype=dtype, mode="r", shape=shape
+            )
+
+    return BracketCorpus(
+        num_games=num_games, probability_model=manifest["probability_model"], **columns
+    )
@@ -0,0 +1,114 @@
+"""
+Encode complete brackets as short URL-safe codes.
+
+A bracket is fully determined by which side won each game, one bit per game. The NCAA
+tournament's 63 games pack into 11 characters of the URL-safe base64 alphabet. Bit
+``i`` of the code is set when the right side won game ``i``, with games in heap order
+as returned by :func:`brackets.prediction_engine.level_order`.
+
+Unlike a random seed, a code doesn't depend on the probability model, can describe
+brackets picked by hand, and decodes without any simulation. Identical brackets always
+have the same code.
+
+Play-in games are slots rather than games of the heap-ordered tree, so their results
+have no bits. Codes only cover formats without play-in games, such as the 64-team NCAA
+format, and not :data:`brackets.prediction_engine.NCAA_FIRST_FOUR_FORMAT`.
+"""
+
+import math
+import string
+from collections.abc import Sequence
+
+from brackets import prediction_engine
+from brackets.prediction_engine import Game, Round, TournamentFormat
+
+ALPHABET = string.ascii_uppercase + string.ascii_lowercase + string.digits + "-_"
+BITS_PER_CHARACTER = 6
+
+DIGITS = {character: value for value, character in enumerate(ALPHABET)}
+
+
+def code_length(num_games: int) -> int:
+    return math.ceil(num_games / BITS_PER_CHARACTER)
+
+
+def encode(championship: Game) -> str:
+    """
+    Encode a fully simulated tournament.
+
+    :raises ValueError: If the tournament has play-in games, which can't be encoded.
+    """
+    games = prediction_engine.level_order(championship)
+    num_games = len(games) // 2
+    if any(slot.round == Round.FIRST_FOUR for slot in games[num_games:]):
+        raise ValueError("Tournaments with play-in games can't be encoded.")
+
+    value = 0
+    for i, game in enumerate(games[:num_games]):
+        if game.winner is not game.left.winner:
+            value |= 1 << i
+
+    return pack(value, num_games)
+
+
+def encode_winners(winners: Sequence[int]) -> str:
+    """
+    Encode a tournament from the winning slot of each game.
+
+    :param winners: The winning slot of each game in heap order, as from
+        :func:`brackets.prediction_engine.winner_indices`.
+    """
+    num_games = len(winners)
+
+    value = 0
+    for i, winner in enumerate(winners):
+        right = 2 * i + 2
+        if winner == (winners[right] if right < num_games else right - num_games):
+            value |= 1 << i
+
+    return pack(value, num_games)
+
+
+def pack(value: int, num_games: int) -> str:
+    characters = []
+    for _ in range(code_length(num_games)):
+        value, digit = divmod(value, len(ALPHABET))
+        characters.append(ALPHABET[digit])
+
+    return "".join(reversed(characters))
+
+
+def decode(
+    code: str, tournament_format: TournamentFormat = prediction_engine.NCAA_FORMAT
+) -> Game:
+    """
+    Rebuild a tournament from its code.
+
+    :param code: A code from :func:`encode`.
+    :param tournament_format: The format of the encoded tournament.
+    :returns: The championship game, with the winner of every game filled in.
+    :raises ValueError: If the code isn't a valid code for the format.
+    """
+    championship = prediction_engine.build_tournament(tournament_format)
+    games = prediction_engine.level_order(championship)
+    num_games = len(games) // 2
+    if any(slot.round == Round.FIRST_FOUR for slot in games[num_games:]):
+        raise ValueError("Tournaments with play-in games can't be encoded.")
+
+    if len(code) != code_length(num_games) or not set(code) <= DIGITS.keys():
+        raise ValueError(f"Invalid bracket code {code!r}.")
+
+    value = 0
+    for character in code:
+        value = value * len(ALPHABET) + DIGITS[character]
+
+    if value >> num_games:
+        raise ValueError(f"Invalid bracket code {code!r}.")
+
+    # Fill in winners from the first round up, so both sides of a game are decided
+    # before the game itself.
+    for i in reversed(range(num_games)):
+        game = games[i]
+        game.winner = game.right.winner if value >> i & 1 else game.left.winner
+
+    return championship
@@ -0,0 +1,202 @@
+"""
+List the most likely brackets under the probability model.
+
+There are far too many brackets to enumerate, but the best ones can be built up from
+the best pieces. For every game and every team that could win it, the K most likely
+ways the game's subtree could play out with that team winning are kept, best first.
+A way for a game to play out is a way for each of its two sides to play out, plus the
+result of the game itself. So the K best for a winner are found among the K best of
+the winner's side, combined with the K best of the other side for each possible
+opponent, which a best-first search over those sorted lists finds without trying
+every combination. The K best with a given winner always come from the K best of each
+side with the same winners, because swapping in a better piece with the same winner
+leaves the rest of the bracket's probability unchanged. The result is exact.
+
+Like :mod:`brackets.encoding`, this only covers formats without play-in games.
+"""
+
+import heapq
+import math
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+import numpy as np
+
+from brackets import encoding, odds, prediction_engine
+from brackets.prediction_engine import ProbabilityModel, Round, TournamentFormat
+
+# Most brackets that can be listed at once.
+MAX_BRACKETS = 1000
+
+# One way for a subtree to play out: its log probability, and the winner and rank of
+# the entry used for each side.
+Entry = tuple[float, int, int, int, int]
+
+
+@dataclass(frozen=True)
+class RankedBracket:
+    log_probability: float
+    # The winning slot of each game, in heap order.
+    winners: tuple[int, ...]
+
+    @property
+    def probability(self) -> float:
+        return math.exp(self.log_probability)
+
+    @cached_property
+    def code(self) -> str:
+        return encoding.encode_winners(self.winners)
+
+
+def merge(
+    own: list[Entry],
+    others: dict[int, list[Entry]],
+    log_chances: np.ndarray,
+    k: int,
+) -> list[tuple[float, int, int, int]]:
+    """
+    Find the best combinations of an entry from one side with an entry from the other.
+
+    :param own: Entries for the winner's side, best first.
+    :param others: Entries for the other side by winner, best first.
+    :param log_chances: The log probability of the winner beating each other winner.
+    :param k: The number of combinations to find.
+    :returns: ``(log_probability, own_rank, other_winner, other_rank)`` tuples, best
+        first.
+    """
+    heap = [
+        (-(own[0][0] + entries[0][0] + log_chances[other]), 0, other, 0)
+        for other, entries in others.items()
+        if log_chances[other] > -math.inf
+    ]
+    heapq.heapify(heap)
+    seen = {(rank, other, other_rank) for _, rank, other, other_rank in heap}
+
+    found = []
+    while heap and len(found) < k:
+        negative, rank, other, other_rank = heapq.heappop(heap)
+        found.append((-negative, rank, other, other_rank))
+
+        entries = others[other]
+        for next_rank, next_other_rank in (
+            (rank + 1, other_rank),
+            (rank, other_rank + 1),
+        ):
+            key = (next_rank, other, next_other_rank)
+            if (
+                next_rank < len(own)
+                and next_other_rank < len(entries)
+                and key not in seen
+            ):
+                seen.add(key)
+                heapq.heappush(
+                    heap,
+                    (
+                        -(
+                            own[next_rank][0]
+                            + entries[next_other_rank][0]
+                            + log_chances[other]
+                        ),
+                        next_rank,
+                        other,
+                        next_other_rank,
+                    ),
+                )
+
+    return found
+
+
+@lru_cache(maxsize=16)
+def cached_most_likely(
+    model: ProbabilityModel, tournament_format: TournamentFormat
+) -> tuple[RankedBracket, ...]:
+    k = MAX_BRACKETS
+    model = prediction_engine.model_for_format(model, tournament_format)
+    games = prediction_engine.level_order(
+        prediction_engine.build_tournament(tournament_format)
+    )
+    num_games = len(games) // 2
+    if any(slot.round == Round.FIRST_FOUR for slot in games[num_games:]):
+        raise ValueError("Tournaments with play-in games can't be enumerated.")
+
+    seeds = odds.slot_seeds(games[num_games:])
+
+    # The best entries for each node, by winner.
+    best: list[dict[int, list[Entry]]] = [{} for _ in games]
+    for slot in range(num_games + 1):
+        best[num_games + slot] = {slot: [(0.0, -1, -1, -1, -1)]}
+
+    matrices = {}
+    for i in reversed(range(num_games)):
+        round = games[i].round
+        if round not in matrices:
+            wins = odds.left_win_matrix(model.win_probabilities[round], seeds)
+            with np.errstate(divide="ignore"):
+                matrices[round] = (np.log(wins), np.log1p(-wins))
+
+        log_wins, log_losses = matrices[round]
+        left, right = best[2 * i + 1], best[2 * i + 2]
+
+        node = {}
+        for winner, entries in left.items():
+            node[winner] = [
+                (log_probability, winner, rank, other, other_rank)
+                for log_probability, rank, other, other_rank in merge(
+                    entries, right, log_wins[winner], k
+                )
+            ]
+        for winner, entries in right.items():
+            node[winner] = [
+                (log_probability, other, other_rank, winner, rank)
+                for log_probability, rank, other, other_rank in merge(
+                    entries, left, log_losses[:, winner], k
+                )
+            ]
+
+        best[i] = {winner: entries for winner, entries in node.items() if entries}
+
+    top = heapq.nlargest(
+        k,
+        (
+            (entry[0], winner, rank)
+            for winner, entries in best[0].items()
+            for rank, entry in enumerate(entries)
+        ),
+    )
+
+    brackets = []
+    for log_probability, winner, rank in top:
+        winners = [0] * num_games
+        stack = [(0, winner, rank)]
+        while stack:
+            node, winner, rank = stack.pop()
+            winners[node] = winner
+            _, left_winner, left_rank, right_winner, right_rank = best[node][winner][
+                rank
+            ]
+            if 2 * node + 1 < num_games:
+                stack.append((2 * node + 1, left_winner, left_rank))
+                stack.append((2 * node + 2, right_winner, right_rank))
+
+        brackets.append(RankedBracket(log_probability, tuple(winners)))
+
+    return tuple(brackets)
+
+
+def most_likely(
+    model: ProbabilityModel | None = None,
+    tournament_format: TournamentFormat = prediction_engine.NCAA_FORMAT,
+) -> tuple[RankedBracket, ...]:
+    """
+    Find the :data:`MAX_BRACKETS` most likely brackets, most likely first.
+
+    Results are cached per model and format. Any shorter list is a prefix of this one,
+    so callers wanting fewer brackets slice it rather than finding them again.
+
+    :param model: The probability model to use. Defaults to the active model.
+    :param tournament_format: The format of the tournament.
+    :raises ValueError: If the tournament has play-in games.
+    """
+    return cached_most_likely(
+        model or prediction_engine.active_model, tournament_format
+    )
@@ -0,0 +1,480 @@
+"""
+Estimate the probability of rare tournament outcomes.
+
+Plain simulation needs an enormous number of runs to see events like a 15 seed
+reaching the Final Four often enough to estimate them. Three variance reduction
+techniques are combined here instead:
+
+* Importance sampling. Brackets are drawn from a tilted copy of the probability
+  model that makes upsets more likely. Each bracket is weighted by the ratio of its
+  probability under the real model to its probability under the tilted one, which
+  keeps the estimate unbiased. The tilt is fit to the event being estimated with the
+  cross-entropy method.
+* Stratified sampling by champion seed. The chance of each seed winning it all is
+  known exactly, so brackets are drawn separately for each champion seed and the
+  results combined with those known weights. Samples are allocated to the seeds that
+  contribute the most variance.
+* Antithetic draws. Each bracket is paired with one drawn from the mirrored random
+  numbers, which tends to cancel out some of the noise between the two.
+
+Brackets are drawn from the top down: first the champion, then the team each winner
+beat, working down to the first round. Given the exact distribution of who wins each
+game from :mod:`brackets.odds`, this draws complete brackets with exactly the model's
+probabilities, and makes conditioning on the champion straightforward. Every estimate
+comes with a confidence interval.
+"""
+
+import math
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from brackets import odds, prediction_engine
+from brackets.prediction_engine import ProbabilityModel, Round
+
+# z-score of a two sided 95% confidence interval.
+Z_95 = 1.959964
+
+# Proposal probabilities are kept away from 0 and 1 so weights stay bounded.
+MIN_PROBABILITY = 1e-3
+
+CROSS_ENTROPY_ITERATIONS = 4
+CROSS_ENTROPY_SAMPLES = 20_000
+# Fraction of the new fit kept at each cross-entropy step.
+CROSS_ENTROPY_SMOOTHING = 0.7
+# Fewest hits of the event needed to fit the proposal to them.
+MIN_ELITE_SAMPLES = 20
+
+# Fraction of samples spread evenly across strata to measure their variance.
+PILOT_FRACTION = 0.1
+
+# A predicate over sampled brackets, given the winning slot of each game, the seed of
+# each slot and the round of each game.
+Predicate = Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+
+
+@dataclass(frozen=True)
+class Event:
+    description: str
+    predicate: Predicate
+
+
+def seed_wins(seed: int, round: int) -> Event:
+    """
+    A team with the given seed wins a game in the given round.
+    """
+
+    def predicate(
+        winners: np.ndarray, seeds: np.ndarray, rounds: np.ndarray
+    ) -> np.ndarray:
+        return np.any(seeds[winners[:, rounds == round]] == seed, axis=1)
+
+    return Event(f"a {seed} seed wins a game in the {Round(round)}", predicate)
+
+
+def chalk_final_four() -> Event:
+    """
+    Every team in the Final Four is a 1 seed.
+    """
+
+    def predicate(
+        winners: np.ndarray, seeds: np.ndarray, rounds: np.ndarray
+    ) -> np.ndarray:
+        return np.all(seeds[winners[:, rounds == Round.ELITE_8]] == 1, axis=1)
+
+    return Event("every Final Four team is a 1 seed", predicate)
+
+
+def parse_event(raw: str) -> Event:
+    """
+    Parse an event description.
+
+    Supported events are ``wins:SEED:ROUND`` for a seed winning a game in a round
+    numbered from 1 for the round of 64, ``final-four:SEED`` and ``champion:SEED`` as
+    shorthands for that, and ``chalk-final-four``.
+
+    :raises ValueError: If the event isn't recognized.
+    """
+    if raw == "chalk-final-four":
+        return chalk_final_four()
+
+    if match := re.fullmatch(r"wins:(\d+):(\d+)", raw):
+        seed, round = int(match[1]), int(match[2])
+    elif match := re.fullmatch(r"final-four:(\d+)", raw):
+        seed, round = int(match[1]), Round.ELITE_8
+    elif match := re.fullmatch(r"champion:(\d+)", raw):
+        seed, round = int(match[1]), Round.CHAMPIONSHIP
+    else:
+        raise ValueError(f"Unknown event {raw!r}.")
+
+    if not 1 <= seed <= 16 or not Round.ROUND_OF_64 <= round <= Round.CHAMPIONSHIP:
+        raise ValueError(f"Invalid seed or round in {raw!r}.")
+
+    return seed_wins(seed, round)
+
+
+@dataclass(frozen=True)
+class Estimate:
+    probability: float
+    std_error: float
+    # Number of brackets drawn.
+    samples: int
+
+    @property
+    def low(self) -> float:
+        return max(0.0, self.probability - Z_95 * self.std_error)
+
+    @property
+    def high(self) -> float:
+        return min(1.0, self.probability + Z_95 * self.std_error)
+
+    @property
+    def relative_error(self) -> float:
+        if self.probability == 0:
+            return math.inf
+
+        return self.std_error / self.probability
+
+
+class Tournament:
+    """
+    The fixed structure of the NCAA tournament, in heap order.
+    """
+
+    def __init__(self):
+        games = prediction_engine.TOURNAMENT
+        self.num_games = prediction_engine.NUM_GAMES
+        self.rounds = prediction_engine.GAME_ROUNDS
+        self.seeds = odds.slot_seeds(games[self.num_games :])
+
+        # The slots in each subtree, ordered by seed so that antithetic draws of
+        # opponents land on opposite ends of the seed lines.
+        self.subtrees = []
+        for node in range(len(games)):
+            low = high = node
+            while low < self.num_games:
+                low, high = 2 * low + 1, 2 * high + 2
+
+            slots = np.arange(low, high + 1) - self.num_games
+            self.subtrees.append(slots[np.argsort(self.seeds[slots], kind="stable")])
+
+        self.last_slots = np.array([subtree.max() for subtree in self.subtrees])
+
+
+class BracketModel:
+    """
+    A probability model prepared for drawing brackets from the top down.
+    """
+
+    def __init__(self, tournament: Tournament, model: ProbabilityModel):
+        self.tournament = tournament
+        self.model = model
+        self.wins = {
+            round: odds.left_win_matrix(
+                model.win_probabilities[round], tournament.seeds
+            )
+            for round in np.unique(tournament.rounds).tolist()
+        }
+
+        distributions = odds.winner_distributions(model=model)
+        self.distributions = np.vstack(
+            [distributions, np.eye(tournament.num_games + 1)]
+        )
+
+    def champion_odds_by_seed(self) -> np.ndarray:
+        """
+        :returns: The chance of each seed winning it all, indexed by seed.
+        """
+        return np.bincount(
+            self.tournament.seeds, weights=self.distributions[0], minlength=17
+        )
+
+
+@dataclass
+class Sample:
+    # The winning slot of each game, with shape `(samples, games)`.
+    winners: np.ndarray
+    # Log of each bracket's probability under the target model over its probability
+    # under the proposal.
+    log_weights: np.ndarray
+    # For each game, the round, the worse seed, and whether the worse seed won.
+    worse_seeds: np.ndarray
+    upsets: np.ndarray
+
+
+def inverse_cdf(weights: np.ndarray, uniforms: np.ndarray) -> np.ndarray:
+    """
+    Pick an index from each row of weights using the given uniform draws.
+    """
+    cdf = np.cumsum(weights, axis=1)
+    targets = uniforms * cdf[:, -1]
+    indices = (cdf < targets[:, None]).sum(axis=1)
+
+    return np.minimum(indices, weights.shape[1] - 1)
+
+
+def draw(
+    target: BracketModel,
+    proposal: BracketModel,
+    uniforms: np.ndarray,
+    champion_seed: int | None = None,
+) -> Sample:
+    """
+    Draw brackets from the proposal model from the top down.
+
+    :param uniforms: Uniform random numbers with shape ``(samples, games + 1)``.
+    :param champion_seed: Only draw brackets won by this seed.
+    """
+    tournament = proposal.tournament
+    num_samples, num_games = len(uniforms), tournament.num_games
+
+    champions = tournament.subtrees[0]
+    weights = np.broadcast_to(
+        proposal.distributions[0, champions], (num_samples, len(champions))
+    )
+    if champion_seed is not None:
+        weights = weights * (tournament.seeds[champions] == champion_seed)
+
+    winners = np.empty((num_samples, num_games), dtype=np.int64)
+    winners[:, 0] = champions[inverse_cdf(weights, uniforms[:, 0])]
+    log_weights = np.zeros(num_samples)
+    worse_seeds = np.empty((num_samples, num_games), dtype=np.int64)
+    upsets = np.empty((num_samples, num_games), dtype=bool)
+
+    for game in range(num_games):
+        left, right = 2 * game + 1, 2 * game + 2
+        round = tournament.rounds[game]
+        wins = proposal.wins[round]
+        winner = winners[:, game]
+        from_left = winner <= tournament.last_slots[left]
+
+        # The loser came from the other side, in proportion to how likely each team
+        # there was to get this far and then lose to the winner.
+        right_slots, left_slots = tournament.subtrees[right], tournament.subtrees[left]
+        weights = np.where(
+            from_left[:, None],
+            proposal.distributions[right, right_slots]
+            * wins[winner[:, None], right_slots[None, :]],
+            proposal.distributions[left, left_slots]
+            * (1.0 - wins[left_slots[None, :], winner[:, None]]),
+        )
+        choice = inverse_cdf(weights, uniforms[:, game + 1])
+        loser = np.where(from_left, right_slots[choice], left_slots[choice])
+
+        left_team = np.where(from_left, winner, loser)
+        right_team = np.where(from_left, loser, winner)
+        if left < num_games:
+            winners[:, left] = left_team
+            winners[:, right] = right_team
+
+        p = target.wins[round][left_team, right_team]
+        q = wins[left_team, right_team]
+        # A pick the target model rules out gets a weight of zero.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_weights += np.where(
+                from_left, np.log(p) - np.log(q), np.log1p(-p) - np.log1p(-q)
+            )
+
+        # Matches `pick_winner`, where the right team is the worse seed on a tie.
+        left_seed, right_seed = (
+            tournament.seeds[left_team],
+            tournament.seeds[right_team],
+        )
+        worse_is_left = left_seed > right_seed
+        worse_seeds[:, game] = np.maximum(left_seed, right_seed)
+        upsets[:, game] = worse_is_left == from_left
+
+    return Sample(winners, log_weights, worse_seeds, upsets)
+
+
+def tilted_model(
+    model: ProbabilityModel, probabilities: dict[int, np.ndarray], label: str
+) -> ProbabilityModel:
+    win_probabilities = {
+        round: np.clip(p, MIN_PROBABILITY, 1 - MIN_PROBABILITY).tolist()
+        for round, p in probabilities.items()
+    }
+
+    # Labels repeat between fits, so the digest keeps different proposals apart.
+    return ProbabilityModel(
+        f"{model.version}:{label}-{prediction_engine.table_digest(win_probabilities)}",
+        win_probabilities,
+    )
+
+
+def fit_proposal(
+    tournament: Tournament,
+    target: BracketModel,
+    event: Event,
+    rand: np.random.Generator,
+) -> BracketModel:
+    """
+    Fit a tilted model that makes the event common, with the cross-entropy method.
+
+    Starting from the model pulled halfway toward coin flips, each step draws brackets
+    and refits the upset probability for every round and seed to the weighted
+    brackets where the event happened.
+    """
+    rounds = np.unique(tournament.rounds).tolist()
+    game_round_index = np.searchsorted(rounds, tournament.rounds)
+    probabilities = {
+        round: (np.asarray(target.model.win_probabilities[round]) + 0.5) / 2
+        for round in rounds
+    }
+
+    proposal = BracketModel(
+        tournament, tilted_model(target.model, probabilities, "tilted-0")
+    )
+    for step in range(1, CROSS_ENTROPY_ITERATIONS + 1):
+        uniforms = rand.random((CROSS_ENTROPY_SAMPLES, tournament.num_games + 1))
+        sample = draw(target, proposal, uniforms)
+        hits = event.predicate(sample.winners, tournament.seeds, tournament.rounds)
+
+        if hits.sum() < MIN_ELITE_SAMPLES:
+            # The event is still too rare to fit to, so flatten the model further.
+            probabilities = {round: (p + 0.5) / 2 for round, p in probabilities.items()}
+        else:
+            weights = np.where(hits, np.exp(sample.log_weights), 0.0)
+            cells = game_round_index[None, :] * 17 + sample.worse_seeds
+            size = len(rounds) * 17
+            games = np.bincount(
+                cells.ravel(),
+                weights=np.repeat(weights, tournament.num_games),
+                minlength=size,
+            ).reshape(len(rounds), 17)
+            upsets = np.bincount(
+                cells.ravel(),
+                weights=np.repeat(weights, tournament.num_games)
+                * sample.upsets.ravel(),
+                minlength=size,
+            ).reshape(len(rounds), 17)
+
+            for i, round in enumerate(rounds):
+                played = games[i, 1:] > 0
+                fitted = np.divide(
+                    upsets[i, 1:], games[i, 1:], out=np.zeros(16), where=played
+                )
+                probabilities[round] = np.where(
+                    played,
+                    CROSS_ENTROPY_SMOOTHING * fitted
+                    + (1 - CROSS_ENTROPY_SMOOTHING) * probabilities[round],
+                    probabilities[round],
+                )
+
+        proposal = BracketModel(
+            tournament, tilted_model(target.model, probabilities, f"tilted-{step}")
+        )
+
+    return proposal
+
+
+def antithetic_uniforms(
+    rand: np.random.Generator, pairs: int, width: int
+) -> np.ndarray:
+    uniforms = rand.random((pairs, width))
+
+    return np.concatenate([uniforms, 1.0 - uniforms])
+
+
+def pair_means(values: np.ndarray) -> np.ndarray:
+    pairs = len(values) // 2
+
+    return (values[:pairs] + values[pairs:]) / 2
+
+
+def estimate_plain(
+    event: Event,
+    samples: int,
+    model: ProbabilityModel | None = None,
+    seed: int | None = None,
+) -> Estimate:
+    """
+    Estimate the probability of an event by simulating the tournament directly.
+    """
+    tournament = Tournament()
+    target = BracketModel(tournament, model or prediction_engine.active_model)
+    rand = np.random.default_rng(seed)
+
+    sample = draw(target, target, rand.random((samples, tournament.num_games + 1)))
+    hits = event.predicate(sample.winners, tournament.seeds, tournament.rounds).astype(
+        np.float64
+    )
+
+    return Estimate(
+        probability=float(hits.mean()),
+        std_error=float(hits.std(ddof=1) / math.sqrt(samples)),
+        samples=samples,
+    )
+
+
+def estimate(
+    event: Event,
+    samples: int,
+    model: ProbabilityModel | None = None,
+    seed: int | None = None,
+) -> Estimate:
+    """
+    Estimate the probability of an event with importance sampling, stratification by
+    champion seed, and antithetic draws.
+
+    :param event: The event to estimate.
+    :param samples: The number of brackets to draw, not counting the ones used to fit
+        the proposal.
+    :param model: The probability model. Defaults to the active model.
+    :param seed: Seed for the random number generator.
+    """
+    tournament = Tournament()
+    target = BracketModel(tournament, model or prediction_engine.active_model)
+    rand = np.random.default_rng(seed)
+    proposal = fit_proposal(tournament, target, event, rand)
+
+    champion_odds = proposal.champion_odds_by_seed()
+    strata = np.flatnonzero(champion_odds > 0)
+    width = tournament.num_games + 1
+
+    # Values are kept per stratum as the weighted hit indicator averaged over each
+    # antithetic pair, which are independent of one another.
+    values = {seed: [] for seed in strata}
+
+    def sample_stratum(seed: int, pairs: int):
+        if pairs == 0:
+            return
+
+        sample = draw(
+            target, proposal, antithetic_uniforms(rand, pairs, width), int(seed)
+        )
+        hits = event.predicate(sample.winners, tournament.seeds, tournament.rounds)
+        values[seed].append(pair_means(np.where(hits, np.exp(sample.log_weights), 0)))
+
+    pilot_pairs = max(2, int(samples * PILOT_FRACTION / 2 / len(strata)))
+    for seed in strata:
+        sample_stratum(seed, pilot_pairs)
+
+    # Neyman allocation: more samples where a stratum is both likely and noisy.
+    deviations = np.array([np.concatenate(values[seed]).std() for seed in strata])
+    scores = champion_odds[strata] * deviations
+    if not scores.any():
+        scores = champion_odds[strata]
+
+    remaining_pairs = max(0, samples // 2 - pilot_pairs * len(strata))
+    allocation = np.floor(remaining_pairs * scores / scores.sum()).astype(np.int64)
+    for seed, pairs in zip(strata, allocation, strict=True):
+        sample_stratum(seed, int(pairs))
+
+    probability = 0.0
+    variance = 0.0
+    drawn = 0
+    for seed in strata:
+        stratum = np.concatenate(values[seed])
+        drawn += 2 * len(stratum)
+        probability += champion_odds[seed] * stratum.mean()
+        if len(stratum) > 1:
+            variance += champion_odds[seed] ** 2 * stratum.var(ddof=1) / len(stratum)
+
+    return Estimate(
+        probability=float(probability),
+        std_error=float(math.sqrt(variance)),
+        samples=drawn,
+    )
@@ -0,0 +1,228 @@
+"""
+Push live updates to browsers with server-sent events.
+
+Each worker process keeps one :class:`Hub` that fans messages out to the event streams
+it is serving. Messages reach the hubs through a broker. The local broker delivers
+straight to the hub in the same process, which is enough for a single worker. With
+several workers, or when results are recorded from a management command, messages go
+through the broker run by the ``run_event_broker`` command, which relays every message
+it receives to every connected worker. It stands in for a shared broker such as Redis
+or Postgres ``LISTEN``/``NOTIFY``.
+
+Event streams stay open for as long as a page does, so they are only served to ASGI
+requests. Deployments run gunicorn with uvicorn workers for that reason.
+"""
+
+import asyncio
+import json
+import logging
+import socket
+import threading
+import time
+from collections.abc import AsyncIterator
+from functools import cache
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Messages a client may fall behind by before it is disconnected. A disconnected
+# browser reconnects on its own.
+SUBSCRIBER_QUEUE_SIZE = 64
+
+# Seconds between comments sent to keep idle connections open through proxies.
+KEEPALIVE_SECONDS = 15
+
+# Seconds to wait before reconnecting to the broker after losing the connection.
+RECONNECT_SECONDS = 1
+
+
+class Subscription:
+    """
+    A queue of messages for one event stream.
+
+    Subscriptions are fed from other threads, so messages are handed to the queue on
+    the event loop that is reading from it.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, message: str | None) -> bool:
+        """
+        Add a message to the queue. Must be called on the subscription's loop.
+
+        :returns: ``False`` if the subscriber has fallen too far behind, in which case
+            its stream is ended.
+        """
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+            return False
+
+        return True
+
+
+class Hub:
+    """
+    Fan messages out to every event stream served by this process.
+    """
+
+    def __init__(self):
+        self.subscriptions: set[Subscription] = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription()
+        with self.lock:
+            self.subscriptions.add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def deliver(self, message: str) -> None:
+        """
+        Send a message to every subscription. Safe to call from any thread.
+        """
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    self.offer, subscription, message
+                )
+            except RuntimeError:
+                # The loop serving the stream has already shut down.
+                self.unsubscribe(subscription)
+
+    def offer(self, subscription: Subscription, message: str) -> None:
+        if not subscription.offer(message):
+            logger.info("Dropping an event stream that fell behind.")
+            self.unsubscribe(subscription)
+
+
+hub = Hub()
+
+
+class LocalBroker:
+    """
+    Deliver messages to subscribers in the current process only.
+    """
+
+    def publish(self, message: str) -> None:
+        hub.deliver(message)
+
+    def listen(self) -> None:
+        pass
+
+
+class SocketBroker:
+    """
+    Relay messages between processes through the broker at a unix socket.
+
+    Messages are single lines of JSON. Publishing sends a line to the broker, which
+    sends it back to every listening process, including the publisher's own.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.listener: threading.Thread | None = None
+        self.lock = threading.Lock()
+
+    def publish(self, message: str) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.path)
+            sock.sendall(message.encode() + b"\n")
+
+    def listen(self) -> None:
+        """
+        Start relaying messages from the broker to this process's hub.
+        """
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(
+                    target=self.relay, name="event-broker", daemon=True
+                )
+                self.listener.start()
+
+    def relay(self) -> None:
+        while True:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(self.path)
+                    for line in sock.makefile("rb"):
+                        hub.deliver(line.decode().rstrip("\n"))
+            except OSError:
+                logger.exception("Lost connection to the event broker.")
+
+            time.sleep(RECONNECT_SECONDS)
+
+
+@cache
+def get_broker() -> LocalBroker | SocketBroker:
+    if settings.BE_EVENT_BROKER_SOCKET:
+        return SocketBroker(settings.BE_EVENT_BROKER_SOCKET)
+
+    return LocalBroker()
+
+
+def publish(event: str, data: dict) -> None:
+    """
+    Broadcast an event to every connected browser.
+
+    :param event: The event type, which browsers listen for by name.
+    :param data: The JSON-serializable payload of the event.
+    """
+    message = json.dumps({"event": event, "data": data}, separators=(",", ":"))
+
+    try:
+        get_broker().publish(message)
+    except OSError:
+        logger.exception("Failed to publish %s event.", event)
+
+
+def format_event(message: str) -> str:
+    """
+    Format a broker message as a server-sent event.
+    """
+    envelope = json.loads(message)
+    data = json.dumps(envelope["data"], separators=(",", ":"))
+
+    return f"event: {envelope['event']}\ndata: {data}\n\n"
+
+
+async def stream() -> AsyncIterator[str]:
+    """
+    Yield server-sent events until the client disconnects or falls behind.
+    """
+    get_broker().listen()
+    subscription = hub.subscribe()
+
+    try:
+        # Tell the browser how long to wait before reconnecting if the stream ends.
+        yield f"retry: {RECONNECT_SECONDS * 1000}\n\n"
+
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.queue.get(), KEEPALIVE_SECONDS
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if message is None:
+                return
+
+            yield format_event(message)
+    finally:
+        hub.unsubscribe(subscription)
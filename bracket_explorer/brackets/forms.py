@@ -0,0 +1,9 @@
+from django import forms
+
+from brackets import models
+
+
+class BracketForm(forms.ModelForm):
+    class Meta:
+        model = models.Bracket
+        fields = ("name",)
@@ -0,0 +1,218 @@
+"""
+Score how plausible saved brackets are under the probability model.
+
+A bracket's log probability is the sum of the log of the chance of each of its picks.
+Brackets full of favorites score close to zero, and brackets full of upsets score far
+below it. Scores are computed for whole batches of brackets at once with array
+lookups, and stored with the version of the model they were computed under, so they
+only need recomputing when the model changes. Versions end with a hash of the model's
+probabilities, so any change to the table makes the stored scores stale.
+
+Saved brackets are always simulated in the 64-team NCAA format, so scores don't include
+First Four games.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+from django.db.models import Avg, Count, F
+
+from brackets import models, odds, prediction_engine, routers
+from brackets.prediction_engine import (
+    GAME_ROUNDS,
+    NUM_GAMES,
+    TOURNAMENT,
+    ProbabilityModel,
+)
+
+# Number of brackets scored and saved at once.
+BATCH_SIZE = 1000
+
+# Brackets this many standard deviations below the pool's mean are flagged as junk.
+JUNK_Z_SCORE = -4.0
+
+
+@lru_cache(maxsize=16)
+def left_win_tensor(model: ProbabilityModel) -> np.ndarray:
+    """
+    Stack the chance of the left team winning every matchup, indexed by round number.
+    """
+    seeds = odds.slot_seeds(TOURNAMENT[NUM_GAMES:])
+
+    tensor = np.zeros((GAME_ROUNDS.max() + 1, NUM_GAMES + 1, NUM_GAMES + 1))
+    for round in np.unique(GAME_ROUNDS).tolist():
+        tensor[round] = odds.left_win_matrix(
+            model.win_probabilities[prediction_engine.round_for(round)], seeds
+        )
+
+    tensor.flags.writeable = False
+
+    return tensor
+
+
+def log_probabilities(
+    winners: np.ndarray, model: ProbabilityModel | None = None
+) -> np.ndarray:
+    """
+    Compute the log probability of many brackets at once.
+
+    :param winners: The winning slot of each game of each bracket, with shape
+        ``(brackets, games)``, as from :func:`brackets.prediction_engine.winner_indices`.
+    :param model: The probability model to use. Defaults to the active model.
+    :returns: The natural log of each bracket's probability, which is ``-inf`` for
+        brackets the model rules out.
+    """
+    winners = np.asarray(winners).reshape(-1, NUM_GAMES)
+    tensor = left_win_tensor(model or prediction_engine.active_model)
+
+    # Every node's winner, where the winner of a slot is the slot itself.
+    slots = np.broadcast_to(np.arange(NUM_GAMES + 1), (len(winners), NUM_GAMES + 1))
+    nodes = np.hstack([winners, slots])
+    left, right = nodes[:, 1::2], nodes[:, 2::2]
+
+    left_wins = tensor[GAME_ROUNDS, left, right]
+    with np.errstate(divide="ignore"):
+        return np.log(np.where(winners == left, left_wins, 1.0 - left_wins)).sum(axis=1)
+
+
+def bracket_winners(brackets: list[models.Bracket]) -> np.ndarray:
+    return np.array(
+        [prediction_engine.winner_indices(bracket.predict()) for bracket in brackets]
+    ).reshape(-1, NUM_GAMES)
+
+
+def score_brackets(brackets: list[models.Bracket]) -> None:
+    """
+    Set the log probability of brackets under the active model, without saving them.
+    """
+    model = prediction_engine.active_model
+    scores = log_probabilities(bracket_winners(brackets), model)
+    for bracket, log_probability in zip(brackets, scores.tolist(), strict=True):
+        bracket.log_probability = log_probability
+        bracket.probability_model = model.version
+
+
+def save_scores(brackets: list[models.Bracket]) -> None:
+    if brackets:
+        score_brackets(brackets)
+        models.Bracket.objects.bulk_update(
+            brackets, ["log_probability", "probability_model"]
+        )
+
+
+def update_log_probabilities(force: bool = False) -> int:
+    """
+    Rescore brackets that were scored under a different model, or not at all.
+
+    :param force: Rescore every bracket.
+    :returns: The number of brackets rescored.
+    """
+    brackets = models.Bracket.objects.order_by().only(
+        "id", "random_seed", "log_probability", "probability_model"
+    )
+    if not force:
+        brackets = brackets.exclude(
+            probability_model=prediction_engine.active_model.version
+        )
+
+    updated = 0
+    batch = []
+    # Replicas may not have caught up with brackets rescored earlier in the run.
+    with routers.use_primary():
+        for bracket in brackets.iterator(chunk_size=BATCH_SIZE):
+            batch.append(bracket)
+            if len(batch) == BATCH_SIZE:
+                save_scores(batch)
+                updated += len(batch)
+                batch = []
+
+        save_scores(batch)
+
+    return updated + len(batch)
+
+
+def scored_brackets():
+    return models.Bracket.objects.filter(
+        probability_model=prediction_engine.active_model.version
+    ).only("name", "log_probability")
+
+
+def most_chalk(limit: int) -> list[models.Bracket]:
+    return list(scored_brackets().order_by("-log_probability", "created_at")[:limit])
+
+
+def most_chaotic(limit: int) -> list[models.Bracket]:
+    return list(scored_brackets().order_by("log_probability", "created_at")[:limit])
+
+
+def duplicates() -> list[list[models.Bracket]]:
+    """
+    Find groups of brackets with identical picks.
+
+    Identical brackets have identical log probabilities, so only brackets sharing a
+    score with another one are compared pick by pick.
+    """
+    shared = (
+        scored_brackets()
+        .values("log_probability")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .values("log_probability")
+    )
+    candidates = list(
+        scored_brackets()
+        .filter(log_probability__in=shared)
+        .only("name", "random_seed", "log_probability")
+        .order_by("log_probability", "created_at")
+    )
+    if not candidates:
+        return []
+
+    _, groups = np.unique(bracket_winners(candidates), axis=0, return_inverse=True)
+    groups = groups.ravel()
+
+    return [
+        [candidates[i] for i in np.flatnonzero(groups == group)]
+        for group in np.unique(groups)
+        if np.count_nonzero(groups == group) > 1
+    ]
+
+
+@dataclass(frozen=True)
+class PoolStatistics:
+    mean: float
+    std: float
+
+
+def pool_statistics() -> PoolStatistics | None:
+    stats = scored_brackets().aggregate(
+        mean=Avg("log_probability"),
+        mean_square=Avg(F("log_probability") * F("log_probability")),
+    )
+    if stats["mean"] is None:
+        return None
+
+    variance = max(0.0, stats["mean_square"] - stats["mean"] ** 2)
+
+    return PoolStatistics(stats["mean"], variance**0.5)
+
+
+def junk(z_score: float = JUNK_Z_SCORE) -> list[models.Bracket]:
+    """
+    Find brackets far less plausible than the rest of the pool.
+
+    :param z_score: How many standard deviations below the pool's mean a bracket must
+        be to be flagged.
+    """
+    stats = pool_statistics()
+    if stats is None or stats.std == 0:
+        return []
+
+    threshold = stats.mean + z_score * stats.std
+
+    return list(
+        scored_brackets()
+        .filter(log_probability__lt=threshold)
+        .order_by("log_probability", "created_at")
+    )
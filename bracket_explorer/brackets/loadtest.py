@@ -0,0 +1,403 @@
+"""
+Replay a realistic mix of traffic against a running site.
+
+Each scenario stands in for a kind of visitor: people clicking through to random
+brackets, crowds loading the same few brackets shared on social media, one-off brackets
+nobody else looks at, and signed in users listing and saving their brackets. Workers
+pick scenarios by weight in a closed loop, so the offered load is set by the number of
+concurrent workers. Running phases at increasing concurrency shows where throughput
+stops scaling for a given number of server workers.
+"""
+
+import http.client
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from itertools import count, pairwise
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+from django.urls import reverse
+
+from brackets import encoding
+from brackets.prediction_engine import NUM_GAMES
+
+
+def random_code(rand: random.Random) -> str:
+    return encoding.pack(rand.getrandbits(NUM_GAMES), NUM_GAMES)
+
+
+# Brackets shared by many visitors. Shared links point straight at a bracket's code.
+# They are fixed so repeated runs hit the same brackets, and weighted by rank so a few
+# of them are much more popular than the rest.
+NUM_HOT_BRACKETS = 20
+_hot_bracket_random = random.Random("hot-brackets")
+HOT_CODES = [random_code(_hot_bracket_random) for _ in range(NUM_HOT_BRACKETS)]
+HOT_CODE_WEIGHTS = [1 / rank for rank in range(1, NUM_HOT_BRACKETS + 1)]
+
+DEFAULT_MIX = {
+    "random": 2.0,
+    "hot": 5.0,
+    "long-tail": 3.0,
+    "list": 1.0,
+    "save": 0.5,
+    "api": 1.0,
+}
+
+# Scenarios that need a signed in user.
+AUTHENTICATED_SCENARIOS = {"list", "save"}
+
+PERCENTILES = (50, 95, 99)
+
+# Minimum throughput gain for another step of concurrency to count as scaling.
+SCALING_THRESHOLD = 1.05
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    An HTTP connection over a unix socket, such as the one gunicorn listens on.
+    """
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+@dataclass(frozen=True)
+class Target:
+    """
+    The server to send requests to.
+    """
+
+    scheme: str
+    # Value of the `Host` header, which must be in the site's `ALLOWED_HOSTS`.
+    host: str
+    # The `host:port` to connect to, or the path of a unix socket.
+    address: str
+    unix_socket: bool = False
+
+    @classmethod
+    def parse(cls, target: str, host: str | None = None) -> "Target":
+        """
+        Parse a target from an HTTP(S) URL or ``unix:/path/to/socket``.
+
+        :param host: The `Host` header to send, if it differs from the address.
+        :raises ValueError: If the target is not a supported URL.
+        """
+        if target.startswith("unix:"):
+            return cls("http", host or "localhost", target[5:], unix_socket=True)
+
+        parts = urlsplit(target)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise ValueError(f"Expected an HTTP(S) URL or unix socket, got {target!r}.")
+
+        return cls(parts.scheme, host or parts.netloc, parts.netloc)
+
+    @property
+    def origin(self) -> str:
+        return f"{self.scheme}://{self.host}"
+
+    def connect(self, timeout: float) -> http.client.HTTPConnection:
+        if self.unix_socket:
+            return UnixHTTPConnection(self.address, timeout)
+
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.address, timeout=timeout)
+
+        return http.client.HTTPConnection(self.address, timeout=timeout)
+
+
+@dataclass(frozen=True)
+class Credentials:
+    """
+    Cookies identifying a signed in user.
+    """
+
+    cookies: dict[str, str]
+    csrf_token: str
+
+    @property
+    def cookie_header(self) -> str:
+        return "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    expected_status: int
+    body: str | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class EndpointStats:
+    """
+    Outcomes of the requests made for one scenario.
+    """
+
+    # Latency in seconds of every request that got a response.
+    latencies: list[float] = field(default_factory=list)
+    # Requests that failed to get a response or got an unexpected status.
+    errors: int = 0
+    statuses: Counter = field(default_factory=Counter)
+
+    @property
+    def requests(self) -> int:
+        return self.statuses.total()
+
+    def merge(self, other: "EndpointStats") -> None:
+        self.latencies.extend(other.latencies)
+        self.errors += other.errors
+        self.statuses.update(other.statuses)
+
+    def percentiles(self) -> list[float]:
+        if not self.latencies:
+            return [float("nan")] * len(PERCENTILES)
+
+        return np.percentile(self.latencies, PERCENTILES).tolist()
+
+
+@dataclass
+class PhaseResult:
+    """
+    The outcome of running the load test at a fixed concurrency.
+    """
+
+    concurrency: int
+    elapsed: float
+    endpoints: dict[str, EndpointStats]
+
+    @property
+    def total(self) -> EndpointStats:
+        total = EndpointStats()
+        for stats in self.endpoints.values():
+            total.merge(stats)
+
+        return total
+
+    def throughput(self, stats: EndpointStats) -> float:
+        return stats.requests / self.elapsed
+
+
+class LoadTest:
+    """
+    A traffic mix to replay against a target.
+
+    :param target: The server to send requests to.
+    :param mix: The relative weight of each scenario.
+    :param credentials: The user to sign in as for authenticated scenarios.
+    :param api_paths: Paths to choose between for API calls.
+    :param timeout: Seconds to wait for a response before counting an error.
+    :param seed: Seed for choosing requests, making the sequence repeatable.
+    :param keep_alive: Whether each worker reuses one connection for its requests,
+        the way browsers do, instead of connecting for every request.
+    """
+
+    def __init__(
+        self,
+        target: Target,
+        mix: dict[str, float],
+        credentials: Credentials | None = None,
+        api_paths: list[str] | None = None,
+        timeout: float = 30.0,
+        seed: str | None = None,
+        keep_alive: bool = False,
+    ):
+        unknown = set(mix) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        if credentials is None and AUTHENTICATED_SCENARIOS & set(mix):
+            raise ValueError("Authenticated scenarios need credentials.")
+
+        if not api_paths and "api" in mix:
+            raise ValueError("API calls need at least one API path.")
+
+        self.target = target
+        self.mix = mix
+        self.credentials = credentials
+        self.api_paths = api_paths or []
+        self.timeout = timeout
+        self.seed = seed
+        self.keep_alive = keep_alive
+        self.save_counter = count(1)
+
+    def run(self, concurrency: int, duration: float) -> PhaseResult:
+        """
+        Send requests from ``concurrency`` workers for ``duration`` seconds.
+        """
+        deadline = time.monotonic() + duration
+        results = [{} for _ in range(concurrency)]
+        workers = [
+            threading.Thread(target=self.work, args=(i, deadline, results[i]))
+            for i in range(concurrency)
+        ]
+
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        endpoints = {name: EndpointStats() for name in self.mix}
+        for result in results:
+            for name, stats in result.items():
+                endpoints[name].merge(stats)
+
+        return PhaseResult(concurrency, elapsed, endpoints)
+
+    def work(self, index: int, deadline: float, stats: dict[str, EndpointStats]):
+        rand = random.Random(None if self.seed is None else f"{self.seed}-{index}")
+        names, weights = list(self.mix), list(self.mix.values())
+        connection = None
+
+        while time.monotonic() < deadline:
+            name = rand.choices(names, weights)[0]
+            request = SCENARIOS[name](self, rand)
+            headers = {"Host": self.target.host, **request.headers}
+            if not self.keep_alive:
+                headers["Connection"] = "close"
+            endpoint = stats.setdefault(name, EndpointStats())
+
+            # Without keep-alive each request opens a new connection, so the latency
+            # includes connecting. With it, only a worker's first request does, and
+            # those that follow the server closing the connection or an error.
+            if connection is None:
+                connection = self.target.connect(self.timeout)
+            start = time.perf_counter()
+            try:
+                connection.request(
+                    request.method, request.path, body=request.body, headers=headers
+                )
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                endpoint.errors += 1
+                endpoint.statuses["error"] += 1
+                connection.close()
+                connection = None
+                continue
+
+            endpoint.latencies.append(time.perf_counter() - start)
+            endpoint.statuses[response.status] += 1
+            if response.status != request.expected_status:
+                endpoint.errors += 1
+
+            if not self.keep_alive or response.will_close:
+                connection.close()
+                connection = None
+
+        if connection is not None:
+            connection.close()
+
+    def authenticated_headers(self) -> dict[str, str]:
+        return {"Cookie": self.credentials.cookie_header}
+
+
+def random_redirect(load_test: LoadTest, rand: random.Random) -> Request:
+    return Request("GET", reverse("random-prediction"), 302)
+
+
+def hot_bracket(load_test: LoadTest, rand: random.Random) -> Request:
+    code = rand.choices(HOT_CODES, HOT_CODE_WEIGHTS)[0]
+
+    return Request("GET", reverse("bracket-detail", kwargs={"code": code}), 200)
+
+
+def long_tail_bracket(load_test: LoadTest, rand: random.Random) -> Request:
+    # Random bits make a valid code for a bracket that almost certainly isn't cached.
+    code = random_code(rand)
+
+    return Request("GET", reverse("bracket-detail", kwargs={"code": code}), 200)
+
+
+def bracket_list(load_test: LoadTest, rand: random.Random) -> Request:
+    return Request(
+        "GET", reverse("bracket-list"), 200, headers=load_test.authenticated_headers()
+    )
+
+
+def bracket_save(load_test: LoadTest, rand: random.Random) -> Request:
+    body = urlencode({"name": f"Load test {next(load_test.save_counter)}"})
+    headers = {
+        **load_test.authenticated_headers(),
+        "Content-Type": "application/x-www-form-urlencoded",
+        "Origin": load_test.target.origin,
+        "X-CSRFToken": load_test.credentials.csrf_token,
+    }
+
+    return Request("POST", reverse("bracket-list"), 302, body=body, headers=headers)
+
+
+def api_call(load_test: LoadTest, rand: random.Random) -> Request:
+    return Request("GET", rand.choice(load_test.api_paths), 200)
+
+
+SCENARIOS: dict[str, Callable[[LoadTest, random.Random], Request]] = {
+    "random": random_redirect,
+    "hot": hot_bracket,
+    "long-tail": long_tail_bracket,
+    "list": bracket_list,
+    "save": bracket_save,
+    "api": api_call,
+}
+
+
+def parse_mix(raw: str) -> dict[str, float]:
+    """
+    Parse a traffic mix such as ``hot=5,long-tail=3``.
+
+    :raises ValueError: If the mix is malformed.
+    """
+    mix = {}
+    for item in raw.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight)
+
+    if any(weight < 0 for weight in mix.values()) or not any(mix.values()):
+        raise ValueError("Scenario weights must be non-negative and not all zero.")
+
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def merge_phases(results: list[PhaseResult]) -> PhaseResult:
+    """
+    Combine consecutive phases at the same concurrency into one result.
+    """
+    endpoints = {}
+    for result in results:
+        for name, stats in result.endpoints.items():
+            endpoints.setdefault(name, EndpointStats()).merge(stats)
+
+    return PhaseResult(
+        concurrency=results[0].concurrency,
+        elapsed=sum(result.elapsed for result in results),
+        endpoints=endpoints,
+    )
+
+
+def find_saturation(results: list[PhaseResult]) -> PhaseResult | None:
+    """
+    Find the phase after which adding concurrency stopped increasing throughput.
+
+    :param results: Phases in order of increasing concurrency.
+    :returns: The last phase before scaling stopped, or ``None`` if throughput kept
+        scaling.
+    """
+    for previous, current in pairwise(results):
+        previous_throughput = previous.throughput(previous.total)
+        if current.throughput(current.total) < previous_throughput * SCALING_THRESHOLD:
+            return previous
+
+    return None
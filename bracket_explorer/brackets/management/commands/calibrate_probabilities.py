@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from brackets import calibration, prediction_engine
+
+
+class Command(BaseCommand):
+    help = (
+        "Fit per-round seed win probabilities from historical results. If the output "
+        "table already exists, only seasons it doesn't include yet are added."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "results",
+            type=Path,
+            help=(
+                "CSV of historical games with season, round, winner_seed and "
+                "loser_seed columns."
+            ),
+        )
+        parser.add_argument(
+            "output", type=Path, help="Path of the probability table to write."
+        )
+        parser.add_argument(
+            "--prior-strength",
+            type=float,
+            help=(
+                "Number of games the smoothed curve is worth when shrinking observed "
+                "win rates."
+            ),
+        )
+
+    def handle(
+        self,
+        *args,
+        results: Path,
+        output: Path,
+        prior_strength: float | None,
+        **options,
+    ):
+        if output.exists():
+            table = calibration.Calibration.load(output)
+        else:
+            table = calibration.Calibration()
+
+        if prior_strength is not None and prior_strength != table.prior_strength:
+            table.prior_strength = prior_strength
+            table.version += 1
+
+        try:
+            games = calibration.read_results(results)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        new_seasons = table.add_results(games)
+        table.save(output)
+
+        if new_seasons:
+            seasons = ", ".join(str(season) for season in new_seasons)
+            self.stdout.write(f"Added seasons: {seasons}")
+        else:
+            self.stdout.write("No new seasons to add.")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote version {table.version} of the table to {output} as model "
+                f"{prediction_engine.load_model(output).version!r}."
+            )
+        )
@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from brackets import estimation
+
+
+class Command(BaseCommand):
+    help = (
+        "Estimate the probability of a rare tournament outcome with a 95% confidence "
+        "interval, using importance sampling, stratification by champion seed and "
+        "antithetic draws."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "events",
+            nargs="+",
+            help=(
+                "Events to estimate: `wins:SEED:ROUND` for a seed winning a game in a "
+                "round numbered from 1 for the round of 64, `final-four:SEED`, "
+                "`champion:SEED` or `chalk-final-four`."
+            ),
+        )
+        parser.add_argument(
+            "--samples",
+            default=100_000,
+            type=int,
+            help="Number of brackets to draw for each event.",
+        )
+        parser.add_argument(
+            "--plain",
+            action="store_true",
+            help="Also estimate each event by plain simulation, for comparison.",
+        )
+        parser.add_argument(
+            "--seed", type=int, help="Seed for a repeatable sequence of samples."
+        )
+
+    def handle(
+        self,
+        *args,
+        events: list[str],
+        samples: int,
+        plain: bool,
+        seed: int | None,
+        **options,
+    ):
+        if samples < 2:
+            raise CommandError("At least 2 samples are needed.")
+
+        try:
+            parsed = [estimation.parse_event(event) for event in events]
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{'Event':<42}{'Method':<10}{'Probability':>13}{'95% interval':>26}"
+            f"{'Rel. error':>12}{'Seconds':>9}"
+        )
+        for event in parsed:
+            start = time.perf_counter()
+            result = estimation.estimate(event, samples, seed=seed)
+            self.write_estimate(event.description, "reduced", result, start)
+
+            if plain:
+                start = time.perf_counter()
+                result = estimation.estimate_plain(event, samples, seed=seed)
+                self.write_estimate("", "plain", result, start)
+
+    def write_estimate(
+        self, description: str, method: str, result: estimation.Estimate, start: float
+    ):
+        interval = f"[{result.low:.3e}, {result.high:.3e}]"
+        relative_error = f"{result.relative_error:.2%}" if result.probability else "-"
+        self.stdout.write(
+            f"{description:<42}{method:<10}{result.probability:>13.3e}{interval:>26}"
+            f"{relative_error:>12}{time.perf_counter() - start:>9.1f}"
+        )
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from brackets import corpus, models, prediction_engine
+
+
+class Command(BaseCommand):
+    help = "Export every bracket's predicted winners to a columnar corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path, help="Directory to write the corpus to.")
+        parser.add_argument(
+            "--chunk-size",
+            default=10_000,
+            type=int,
+            help="Number of brackets to fetch and write at a time.",
+        )
+
+    def handle(self, *args, path: Path, chunk_size: int, **options):
+        # `iterator` streams rows through a server-side cursor on Postgres instead of
+        # loading the whole table.
+        rows = (
+            models.Bracket.objects.order_by()
+            .values_list("id", "owner_id", "created_at", "random_seed")
+            .iterator(chunk_size=chunk_size)
+        )
+
+        with corpus.CorpusWriter(
+            path, prediction_engine.NUM_GAMES, prediction_engine.active_model.version
+        ) as writer:
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == chunk_size:
+                    writer.write(self.build_columns(chunk))
+                    chunk = []
+
+            if chunk:
+                writer.write(self.build_columns(chunk))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {writer.num_rows} brackets to {path} under model "
+                f"{writer.probability_model!r}."
+            )
+        )
+
+    def build_columns(self, rows: list[tuple]) -> dict[str, np.ndarray]:
+        ids, owner_ids, created_ats, seeds = zip(*rows, strict=True)
+
+        return {
+            "id": np.array([i.bytes for i in ids]),
+            "owner_id": np.array([i.bytes for i in owner_ids]),
+            "created_at": np.array(
+                [corpus.to_microseconds(c) for c in created_ats], dtype=np.int64
+            ).astype(corpus.COLUMNS["created_at"]),
+            "random_seed": np.array(seeds, dtype=np.int64),
+            "winners": np.array(
+                [
+                    prediction_engine.winner_indices(
+                        prediction_engine.predict(str(seed))
+                    )
+                    for seed in seeds
+                ],
+                dtype=np.uint8,
+            ),
+        }
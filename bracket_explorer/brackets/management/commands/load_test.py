@@ -0,0 +1,288 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.crypto import get_random_string
+
+from brackets import loadtest, models
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a mix of traffic against a running site and report latency, "
+        "throughput and errors for each kind of request. Saving brackets creates "
+        "real brackets owned by the given user."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "target",
+            help="URL of the site, or `unix:/path/to/socket` to talk to gunicorn.",
+        )
+        parser.add_argument(
+            "--host", help="Host header to send. Defaults to the target's host."
+        )
+        parser.add_argument(
+            "--mode",
+            choices=("constant", "step", "soak"),
+            default="constant",
+            help=(
+                "Run at a single concurrency, step the concurrency up to find the "
+                "saturation point, or hold a concurrency and report each interval."
+            ),
+        )
+        parser.add_argument(
+            "--concurrency",
+            default=8,
+            type=int,
+            help="Number of concurrent clients, or the first step in step mode.",
+        )
+        parser.add_argument(
+            "--max-concurrency",
+            default=64,
+            type=int,
+            help="Highest concurrency to try in step mode.",
+        )
+        parser.add_argument(
+            "--step-size",
+            default=8,
+            type=int,
+            help="Concurrency added by each step in step mode.",
+        )
+        parser.add_argument(
+            "--duration",
+            default=30.0,
+            type=float,
+            help="Seconds to run each phase, or the whole run in soak mode.",
+        )
+        parser.add_argument(
+            "--report-interval",
+            default=60.0,
+            type=float,
+            help="Seconds between reports in soak mode.",
+        )
+        parser.add_argument(
+            "--mix",
+            help=(
+                "Comma separated weights for each scenario, e.g. `hot=5,long-tail=3`. "
+                f"Scenarios are: {', '.join(loadtest.SCENARIOS)}."
+            ),
+        )
+        parser.add_argument(
+            "--user",
+            help="Email of the user to sign in as for listing and saving brackets.",
+        )
+        parser.add_argument(
+            "--api-path",
+            action="append",
+            default=[],
+            dest="api_paths",
+            help="Path to request for API calls. May be given multiple times.",
+        )
+        parser.add_argument(
+            "--timeout",
+            default=30.0,
+            type=float,
+            help="Seconds to wait for a response before counting it as an error.",
+        )
+        parser.add_argument("--seed", help="Seed for a repeatable request sequence.")
+        parser.add_argument(
+            "--keep-alive",
+            action="store_true",
+            help=(
+                "Reuse one connection per client, like browsers do, instead of "
+                "connecting for every request."
+            ),
+        )
+
+    def handle(
+        self,
+        *args,
+        target: str,
+        host: str | None,
+        mode: str,
+        concurrency: int,
+        max_concurrency: int,
+        step_size: int,
+        duration: float,
+        report_interval: float,
+        mix: str | None,
+        user: str | None,
+        api_paths: list[str],
+        timeout: float,
+        seed: str | None,
+        keep_alive: bool,
+        **options,
+    ):
+        if mix is None:
+            traffic_mix = self.default_mix(user, api_paths)
+        else:
+            try:
+                traffic_mix = loadtest.parse_mix(mix)
+            except ValueError as e:
+                raise CommandError(f"Invalid mix: {e}")
+
+        session = self.login(user) if user else None
+        try:
+            try:
+                load_test = loadtest.LoadTest(
+                    loadtest.Target.parse(target, host),
+                    traffic_mix,
+                    credentials=self.credentials(session) if session else None,
+                    api_paths=api_paths,
+                    timeout=timeout,
+                    seed=seed,
+                    keep_alive=keep_alive,
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            if mode == "step":
+                self.run_steps(
+                    load_test, concurrency, max_concurrency, step_size, duration
+                )
+            elif mode == "soak":
+                self.run_soak(load_test, concurrency, duration, report_interval)
+            else:
+                self.report(load_test.run(concurrency, duration))
+        finally:
+            if session is not None:
+                session.delete()
+
+    def default_mix(self, user: str | None, api_paths: list[str]) -> dict[str, float]:
+        skipped = set()
+        if user is None:
+            skipped |= loadtest.AUTHENTICATED_SCENARIOS
+        if not api_paths:
+            skipped.add("api")
+
+        if skipped:
+            self.stdout.write(
+                self.style.WARNING(f"Skipping scenarios: {', '.join(sorted(skipped))}")
+            )
+
+        return {
+            name: weight
+            for name, weight in loadtest.DEFAULT_MIX.items()
+            if name not in skipped
+        }
+
+    def login(self, email: str):
+        """
+        Create a session for a user the same way logging in would.
+        """
+        try:
+            user = models.User.objects.get(email=email)
+        except models.User.DoesNotExist:
+            raise CommandError(f"There is no user with the email {email!r}.")
+
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+
+        return session
+
+    def credentials(self, session) -> loadtest.Credentials:
+        # Django accepts any well-formed CSRF secret, as long as the cookie and the
+        # submitted token match.
+        csrf_token = get_random_string(32)
+
+        return loadtest.Credentials(
+            cookies={
+                settings.SESSION_COOKIE_NAME: session.session_key,
+                settings.CSRF_COOKIE_NAME: csrf_token,
+            },
+            csrf_token=csrf_token,
+        )
+
+    def run_steps(
+        self,
+        load_test: loadtest.LoadTest,
+        start: int,
+        stop: int,
+        step: int,
+        duration: float,
+    ):
+        results = []
+        for concurrency in range(start, stop + 1, step):
+            result = load_test.run(concurrency, duration)
+            self.report(result)
+            results.append(result)
+
+        self.stdout.write("")
+        self.write_summary(results)
+
+        saturated = loadtest.find_saturation(results)
+        if saturated is None:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Throughput was still scaling at the highest concurrency."
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Throughput stopped scaling after {saturated.concurrency} "
+                    f"concurrent clients, at "
+                    f"{saturated.throughput(saturated.total):.1f} requests per second."
+                )
+            )
+
+    def run_soak(
+        self,
+        load_test: loadtest.LoadTest,
+        concurrency: int,
+        duration: float,
+        interval: float,
+    ):
+        results = []
+        remaining = duration
+        while remaining > 0:
+            result = load_test.run(concurrency, min(interval, remaining))
+            remaining -= result.elapsed
+            results.append(result)
+            self.write_summary([result], header=len(results) == 1)
+
+        self.report(loadtest.merge_phases(results))
+
+    def report(self, result: loadtest.PhaseResult):
+        self.stdout.write(
+            f"\n{result.concurrency} concurrent clients for {result.elapsed:.1f}s"
+        )
+        self.stdout.write(
+            f"{'Scenario':<12}{'Requests':>10}{'Errors':>8}{'Req/s':>10}"
+            + "".join(f"{f'p{p} ms':>10}" for p in loadtest.PERCENTILES)
+        )
+
+        rows = [*result.endpoints.items(), ("total", result.total)]
+        for name, stats in rows:
+            self.stdout.write(
+                f"{name:<12}{stats.requests:>10}{stats.errors:>8}"
+                f"{result.throughput(stats):>10.1f}"
+                + "".join(f"{p * 1000:>10.1f}" for p in stats.percentiles())
+            )
+
+        statuses = ", ".join(
+            f"{status}: {n}"
+            for status, n in sorted(result.total.statuses.items(), key=str)
+        )
+        self.stdout.write(f"Responses: {statuses}")
+
+    def write_summary(self, results: list[loadtest.PhaseResult], header: bool = True):
+        if header:
+            self.stdout.write(
+                f"{'Clients':>8}{'Seconds':>9}{'Req/s':>10}{'Error %':>9}"
+                + "".join(f"{f'p{p} ms':>10}" for p in loadtest.PERCENTILES)
+            )
+
+        for result in results:
+            total = result.total
+            error_rate = total.errors / total.requests if total.requests else 0.0
+            self.stdout.write(
+                f"{result.concurrency:>8}{result.elapsed:>9.1f}"
+                f"{result.throughput(total):>10.1f}{error_rate:>9.2%}"
+                + "".join(f"{p * 1000:>10.1f}" for p in total.percentiles())
+            )
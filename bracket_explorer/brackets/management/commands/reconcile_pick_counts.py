@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from brackets import popularity
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount every bracket's picks and correct the stored pick counts. Run this "
+        "periodically to correct drift, and after changing the probability model."
+    )
+
+    def handle(self, *args, **options):
+        drift = popularity.reconcile()
+
+        if drift:
+            self.stdout.write(
+                self.style.WARNING(f"Corrected pick counts that were off by {drift}.")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("Pick counts were already correct."))
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from brackets import results
+
+
+class Command(BaseCommand):
+    help = (
+        "Record the winner of a game, rescore every bracket, and push the changes to "
+        "browsers following the tournament."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("region", help="Region of the winning team.")
+        parser.add_argument("seed", type=int, help="Seed of the winning team.")
+        parser.add_argument(
+            "round",
+            type=int,
+            help="Round the game was played in, from 1 for the first round.",
+        )
+        parser.add_argument(
+            "--no-live-updates",
+            action="store_false",
+            dest="live_updates",
+            help=(
+                "Record the result even though BE_EVENT_BROKER_SOCKET isn't set, "
+                "without pushing it to browsers."
+            ),
+        )
+
+    def handle(
+        self, *args, region: str, seed: int, round: int, live_updates: bool, **options
+    ):
+        # This command runs in its own process, so without the broker the update would
+        # only reach event streams served by this process, of which there are none.
+        if live_updates and not settings.BE_EVENT_BROKER_SOCKET:
+            raise CommandError(
+                "BE_EVENT_BROKER_SOCKET isn't set, so browsers wouldn't be updated. "
+                "Start `run_event_broker` and set it, or pass --no-live-updates."
+            )
+
+        labels = [label.lower() for label in results.slot_labels()]
+        try:
+            slot = labels.index(f"{seed} {region}".lower())
+        except ValueError:
+            raise CommandError(f"There is no {seed} seed in the {region} region.")
+
+        if not 1 <= round <= len(results.POINTS_PER_ROUND) - 1:
+            raise CommandError(f"Invalid round {round}.")
+
+        game = results.find_game(slot, round)
+        try:
+            results.record_result(game, slot)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recorded the {seed} seed in the {region} winning game {game}."
+            )
+        )
@@ -0,0 +1,57 @@
+import asyncio
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the broker relaying live update events between worker processes. Every "
+        "line received from a client is sent to every other connected client."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--socket",
+            default=settings.BE_EVENT_BROKER_SOCKET,
+            help="Path of the unix socket to listen on.",
+        )
+
+    def handle(self, *args, socket: str | None, **options):
+        if not socket:
+            raise CommandError("Set BE_EVENT_BROKER_SOCKET or pass --socket.")
+
+        path = Path(socket)
+        path.unlink(missing_ok=True)
+
+        try:
+            asyncio.run(self.serve(path))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path.unlink(missing_ok=True)
+
+    async def serve(self, path: Path):
+        clients: set[asyncio.StreamWriter] = set()
+
+        async def relay(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            clients.add(writer)
+            try:
+                while line := await reader.readline():
+                    # Publishers only send and listeners only receive, so nothing
+                    # is sent back to the client a message came from.
+                    for client in list(clients - {writer}):
+                        if client.is_closing():
+                            clients.discard(client)
+                        else:
+                            client.write(line)
+            finally:
+                clients.discard(writer)
+                writer.close()
+
+        server = await asyncio.start_unix_server(relay, path=str(path))
+        self.stdout.write(self.style.SUCCESS(f"Relaying events on {path}."))
+
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,85 @@
+import random
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from brackets import prediction_engine
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a tournament many times and report how often each seed wins. "
+        "Simulates the 64-team NCAA tournament unless the First Four or a number of "
+        "teams is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", default=10_000, type=int, help="Number of simulations to run."
+        )
+        parser.add_argument(
+            "--first-four",
+            action="store_true",
+            help="Simulate the 68-team NCAA tournament, starting with the First Four.",
+        )
+        parser.add_argument(
+            "--teams",
+            type=int,
+            help="Total number of teams in a generic tournament. Must be a power of two.",
+        )
+        parser.add_argument(
+            "--regions",
+            default=4,
+            type=int,
+            help="Number of regions in a generic tournament. Must be a power of two.",
+        )
+        parser.add_argument(
+            "--seed", default="0", help="Seed for the sequence of simulations."
+        )
+
+    def handle(
+        self,
+        *args,
+        count: int,
+        first_four: bool,
+        teams: int | None,
+        regions: int,
+        seed: str,
+        **options,
+    ):
+        if first_four and teams is not None:
+            raise CommandError("--first-four can't be combined with --teams.")
+
+        if first_four:
+            tournament_format = prediction_engine.NCAA_FIRST_FOUR_FORMAT
+        elif teams is None:
+            tournament_format = prediction_engine.NCAA_FORMAT
+        else:
+            try:
+                tournament_format = prediction_engine.standard_format(
+                    f"{teams}-teams-{regions}-regions", teams, regions
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        rand = random.Random(seed)
+        champions = Counter()
+
+        start = time.perf_counter()
+        for _ in range(count):
+            championship = prediction_engine.predict(
+                str(rand.randrange(2**63)), tournament_format=tournament_format
+            )
+            champions[championship.winner.seed] += 1
+        elapsed = time.perf_counter() - start
+
+        for champion_seed, wins in sorted(champions.items()):
+            self.stdout.write(f"{champion_seed:>4} seed: {wins / count:7.2%}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Simulated {count} tournaments in {elapsed:.2f}s "
+                f"({count / elapsed:.0f} per second)."
+            )
+        )
@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand
+
+from brackets import likelihood, prediction_engine
+
+
+class Command(BaseCommand):
+    help = (
+        "Score how plausible each bracket is under the active probability model. "
+        "Only brackets scored under a different model are rescored, so run this after "
+        "changing the model. Optionally report the most and least plausible "
+        "brackets, duplicates, and junk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", dest="force", help="Rescore every bracket."
+        )
+        parser.add_argument(
+            "--report",
+            action="store_true",
+            help="List the most chalk and most chaotic brackets, duplicates and junk.",
+        )
+        parser.add_argument(
+            "--limit",
+            default=10,
+            type=int,
+            help="Number of brackets to list in each ranking.",
+        )
+        parser.add_argument(
+            "--junk-z-score",
+            default=likelihood.JUNK_Z_SCORE,
+            type=float,
+            help=(
+                "Flag brackets this many standard deviations below the pool's mean "
+                "log probability as junk."
+            ),
+        )
+
+    def handle(
+        self,
+        *args,
+        force: bool,
+        report: bool,
+        limit: int,
+        junk_z_score: float,
+        **options,
+    ):
+        updated = likelihood.update_log_probabilities(force)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Scored {updated} brackets under model "
+                f"{prediction_engine.active_model.version!r}."
+            )
+        )
+
+        if not report:
+            return
+
+        stats = likelihood.pool_statistics()
+        if stats is None:
+            self.stdout.write("There are no brackets to report on.")
+            return
+
+        self.stdout.write(
+            f"\nMean log probability {stats.mean:.2f}, standard deviation "
+            f"{stats.std:.2f}"
+        )
+
+        self.write_brackets("Most chalk", likelihood.most_chalk(limit))
+        self.write_brackets("Most chaotic", likelihood.most_chaotic(limit))
+
+        groups = likelihood.duplicates()
+        self.stdout.write(f"\nDuplicates ({len(groups)} groups)")
+        for group in groups:
+            names = ", ".join(bracket.name for bracket in group)
+            self.stdout.write(f"{group[0].log_probability:>10.2f}  {names}")
+
+        self.write_brackets("Junk", likelihood.junk(junk_z_score))
+
+    def write_brackets(self, title: str, brackets: list):
+        self.stdout.write(f"\n{title} ({len(brackets)})")
+        for bracket in brackets:
+            self.stdout.write(f"{bracket.log_probability:>10.2f}  {bracket.name}")
@@ -0,0 +1,47 @@
+from collections.abc import Callable
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from brackets import routers
+
+# Cookie marking a client whose recent writes may not have reached the replicas yet.
+PIN_COOKIE_NAME = "be_primary_pin"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS", "TRACE"}
+
+
+class ReplicaPinningMiddleware:
+    """
+    Give each client read-your-writes consistency when reading from replicas.
+
+    Requests that may write, and requests from clients that wrote recently, read
+    from the primary. A request that writes sets a cookie pinning the client to the
+    primary for ``DATABASE_REPLICA_PIN_SECONDS``, which should exceed the expected
+    replication lag.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        state = routers.RoutingState(
+            pinned=(
+                request.method not in SAFE_METHODS or PIN_COOKIE_NAME in request.COOKIES
+            )
+        )
+
+        with routers.routing(state):
+            response = self.get_response(request)
+
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                "1",
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+
+        return response
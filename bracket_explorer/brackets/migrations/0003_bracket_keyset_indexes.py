@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-19 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("brackets", "0002_bracket"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="bracket",
+            options={
+                "ordering": ("-created_at", "-id"),
+                "verbose_name": "bracket",
+                "verbose_name_plural": "brackets",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="bracket",
+            index=models.Index(
+                fields=["created_at", "id"], name="bracket_created_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bracket",
+            index=models.Index(
+                fields=["owner", "created_at", "id"],
+                name="bracket_owner_created_at_idx",
+            ),
+        ),
+    ]
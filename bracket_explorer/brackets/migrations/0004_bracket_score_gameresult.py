@@ -0,0 +1,71 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:46
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("brackets", "0003_bracket_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GameResult",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+                (
+                    "game",
+                    models.PositiveSmallIntegerField(
+                        help_text="The index of the game in heap order, starting from the final.",
+                        unique=True,
+                        verbose_name="game",
+                    ),
+                ),
+                (
+                    "winner",
+                    models.PositiveSmallIntegerField(
+                        help_text="The index of the slot the winning team was seeded into.",
+                        verbose_name="winner",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "game result",
+                "verbose_name_plural": "game results",
+                "ordering": ("game",),
+            },
+        ),
+        migrations.AddField(
+            model_name="bracket",
+            name="score",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Points earned for correct picks in games that have been played.",
+                verbose_name="score",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bracket",
+            index=models.Index(
+                fields=["-score", "created_at"], name="bracket_score_created_at_idx"
+            ),
+        ),
+    ]
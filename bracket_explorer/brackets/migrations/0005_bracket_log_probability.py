@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("brackets", "0004_bracket_score_gameresult"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bracket",
+            name="log_probability",
+            field=models.FloatField(
+                blank=True,
+                help_text="Natural log of the chance of the bracket's picks under the probability model.",
+                null=True,
+                verbose_name="log probability",
+            ),
+        ),
+        migrations.AddField(
+            model_name="bracket",
+            name="probability_model",
+            field=models.CharField(
+                blank=True,
+                help_text="Version of the probability model the log probability is from.",
+                max_length=100,
+                verbose_name="probability model",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bracket",
+            index=models.Index(
+                fields=["probability_model", "log_probability"],
+                name="bracket_log_probability_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.15 on 2026-10-19 07:01
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("brackets", "0005_bracket_log_probability"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PickCount",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+                (
+                    "round",
+                    models.PositiveSmallIntegerField(
+                        help_text="The round number, starting from 1 for the first round.",
+                        verbose_name="round",
+                    ),
+                ),
+                (
+                    "slot",
+                    models.PositiveSmallIntegerField(
+                        help_text="The slot the team was seeded into.",
+                        verbose_name="slot",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0, verbose_name="count")),
+            ],
+            options={
+                "verbose_name": "pick count",
+                "verbose_name_plural": "pick counts",
+                "ordering": ("round", "slot"),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("round", "slot"), name="pick_count_round_slot_unique"
+                    )
+                ],
+            },
+        ),
+    ]
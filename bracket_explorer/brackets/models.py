@@ -6,7 +6,7 @@ from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
-from brackets import managers
+from brackets import managers, prediction_engine
 
 
 class TrackedModel(models.Model):
@@ -77,6 +77,119 @@ class Bracket(TrackedModel):
             "bracket predictor."
         ),
     )
+    score = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Points earned for correct picks in games that have been played."),
+        verbose_name=_("score"),
+    )
+    log_probability = models.FloatField(
+        blank=True,
+        help_text=_(
+            "Natural log of the chance of the bracket's picks under the probability "
+            "model."
+        ),
+        null=True,
+        verbose_name=_("log probability"),
+    )
+    probability_model = models.CharField(
+        blank=True,
+        help_text=_("Version of the probability model the log probability is from."),
+        max_length=100,
+        verbose_name=_("probability model"),
+    )
+
+    class Meta:
+        indexes = [
+            # Supports keyset pagination of all brackets, newest first.
+            models.Index(fields=["created_at", "id"], name="bracket_created_at_id_idx"),
+            # Supports keyset pagination of a single user's brackets.
+            models.Index(
+                fields=["owner", "created_at", "id"],
+                name="bracket_owner_created_at_idx",
+            ),
+            # Supports the leaderboard.
+            models.Index(
+                fields=["-score", "created_at"], name="bracket_score_created_at_idx"
+            ),
+            # Supports ranking brackets by how plausible they are.
+            models.Index(
+                fields=["probability_model", "log_probability"],
+                name="bracket_log_probability_idx",
+            ),
+        ]
+        ordering = ("-created_at", "-id")
+        verbose_name = _("bracket")
+        verbose_name_plural = _("brackets")
 
     def __str__(self) -> str:
         return f"bracket '{self.name}'"
+
+    def predict(self) -> prediction_engine.Game:
+        """
+        Simulate the tournament for this bracket.
+
+        The seed is used in its string form so that the results match the prediction
+        page for the same seed.
+        """
+        return prediction_engine.predict(str(self.random_seed))
+
+
+class GameResult(TrackedModel):
+    """
+    The actual winner of a game in the tournament.
+
+    Games and teams are numbered the same way as the winners of a simulated
+    tournament, see :func:`brackets.prediction_engine.winner_indices`.
+    """
+
+    game = models.PositiveSmallIntegerField(
+        help_text=_("The index of the game in heap order, starting from the final."),
+        unique=True,
+        verbose_name=_("game"),
+    )
+    winner = models.PositiveSmallIntegerField(
+        help_text=_("The index of the slot the winning team was seeded into."),
+        verbose_name=_("winner"),
+    )
+
+    class Meta:
+        ordering = ("game",)
+        verbose_name = _("game result")
+        verbose_name_plural = _("game results")
+
+    def __str__(self) -> str:
+        return f"result of game {self.game}"
+
+
+class PickCount(TrackedModel):
+    """
+    How many saved brackets pick a team to win a game in a round.
+
+    Counts are adjusted as brackets change rather than recomputed, see
+    :mod:`brackets.popularity`.
+    """
+
+    round = models.PositiveSmallIntegerField(
+        help_text=_("The round number, starting from 1 for the first round."),
+        verbose_name=_("round"),
+    )
+    slot = models.PositiveSmallIntegerField(
+        help_text=_("The slot the team was seeded into."),
+        verbose_name=_("slot"),
+    )
+    # Not constrained to be positive, so that drift shows up in the counts instead of
+    # failing the saves that caused it.
+    count = models.IntegerField(default=0, verbose_name=_("count"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["round", "slot"], name="pick_count_round_slot_unique"
+            )
+        ]
+        ordering = ("round", "slot")
+        verbose_name = _("pick count")
+        verbose_name_plural = _("pick counts")
+
+    def __str__(self) -> str:
+        return f"{self.count} picks of slot {self.slot} in round {self.round}"
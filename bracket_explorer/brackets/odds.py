@@ -0,0 +1,238 @@
+"""
+Exact tournament odds from the probability model.
+
+Rather than simulating many tournaments, the chance of each team winning each game is
+computed directly. Working up from the first round, the distribution of who wins a game
+follows from the distributions of who wins the two games feeding it and the chance of
+each possible matchup going either way. Games that have already been played have a
+certain winner, so odds can be conditioned on results as they come in.
+
+Teams are identified by the index of the slot they are seeded into, and games by their
+index in heap order, matching :func:`brackets.prediction_engine.winner_indices`.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from brackets import prediction_engine
+from brackets.prediction_engine import (
+    Game,
+    ProbabilityModel,
+    Round,
+    TournamentFormat,
+    game_rounds,
+)
+
+
+def slot_seeds(slots: list[Game]) -> np.ndarray:
+    # A play-in slot is filled by one of two teams on the same seed line, so the slot
+    # has that seed whichever team wins it.
+    return np.array(
+        [
+            (slot.left if slot.round == Round.FIRST_FOUR else slot).winner.seed
+            for slot in slots
+        ]
+    )
+
+
+def left_win_matrix(probabilities: list[float], seeds: np.ndarray) -> np.ndarray:
+    """
+    Compute the chance of the left team winning every possible matchup in a round.
+
+    This mirrors :func:`brackets.prediction_engine.pick_winner`, where the worse seed
+    wins with the probability listed for its seed. When the seeds are equal, the right
+    team is treated as the worse seed.
+
+    :returns: A matrix where entry ``[a, b]`` is the chance that slot ``a`` beats slot
+        ``b`` when ``a`` comes from the left.
+    """
+    upset = np.asarray(probabilities)[seeds - 1]
+    left, right = seeds[:, None], seeds[None, :]
+
+    return np.where(left > right, upset[:, None], 1.0 - upset[None, :])
+
+
+@lru_cache(maxsize=64)
+def cached_distributions(
+    model: ProbabilityModel,
+    tournament_format: TournamentFormat,
+    results: tuple[int, ...],
+) -> np.ndarray:
+    model = prediction_engine.model_for_format(model, tournament_format)
+    games = prediction_engine.level_order(
+        prediction_engine.build_tournament(tournament_format)
+    )
+    num_games = len(games) // 2
+    seeds = slot_seeds(games[num_games:])
+
+    matrices = {}
+    distributions = np.zeros((len(games), num_games + 1))
+    distributions[num_games:] = np.eye(num_games + 1)
+
+    for i in reversed(range(num_games)):
+        if results[i] >= 0:
+            distributions[i, results[i]] = 1.0
+            continue
+
+        round = games[i].round
+        if round not in matrices:
+            matrices[round] = left_win_matrix(model.win_probabilities[round], seeds)
+
+        wins = matrices[round]
+        left, right = distributions[2 * i + 1], distributions[2 * i + 2]
+        distributions[i] = left * (wins @ right) + right * ((1.0 - wins).T @ left)
+
+    distributions = distributions[:num_games]
+    distributions.flags.writeable = False
+
+    return distributions
+
+
+def winner_distributions(
+    results: np.ndarray | None = None,
+    model: ProbabilityModel | None = None,
+    tournament_format: TournamentFormat = prediction_engine.NCAA_FORMAT,
+) -> np.ndarray:
+    """
+    Compute the chance of each team winning each game.
+
+    Results are cached per model, format and set of results, so repeated requests for
+    the same state of the tournament are free.
+
+    :param results: The winning slot of each game, or -1 for games that have not been
+        played. Defaults to no games played.
+    :param model: The probability model to use. Defaults to the active model.
+    :param tournament_format: The format of the tournament.
+    :returns: A read-only array of shape ``(num_games, num_slots)``.
+    """
+    if results is None:
+        num_slots = len(tournament_format.regions) * len(tournament_format.seed_order)
+        results = np.full(num_slots - 1, -1)
+
+    return cached_distributions(
+        model or prediction_engine.active_model,
+        tournament_format,
+        tuple(int(winner) for winner in results),
+    )
+
+
+def advancement_odds(distributions: np.ndarray) -> np.ndarray:
+    """
+    Sum winner distributions into the chance of each team winning in each round.
+
+    :param distributions: Winner distributions from :func:`winner_distributions`.
+    :returns: An array of shape ``(num_rounds + 1, num_slots)`` indexed by round
+        number, so row 0 is always empty.
+    """
+    num_games, num_slots = distributions.shape
+    rounds = game_rounds(num_games)
+
+    odds = np.zeros((rounds.max() + 1, num_slots))
+    np.add.at(odds, rounds, distributions)
+
+    return odds
+
+
+@dataclass(frozen=True)
+class Matchups:
+    """
+    The chance of every pair of teams meeting, and of each side winning if they do.
+
+    Two teams can only ever meet in one game, the first one whose subtree contains
+    both of them, so a matrix of rounds stands in for a separate matrix per round.
+    Every matrix is indexed by slot and read-only.
+    """
+
+    # The round each pair of teams would meet in, or 0 for a team with itself.
+    rounds: np.ndarray
+    # The chance of each pair meeting.
+    meetings: np.ndarray
+    # The chance that the row team beats the column team if they meet.
+    wins: np.ndarray
+
+
+@lru_cache(maxsize=64)
+def cached_matchups(
+    model: ProbabilityModel,
+    tournament_format: TournamentFormat,
+    results: tuple[int, ...],
+) -> Matchups:
+    distributions = cached_distributions(model, tournament_format, results)
+    model = prediction_engine.model_for_format(model, tournament_format)
+    games = prediction_engine.level_order(
+        prediction_engine.build_tournament(tournament_format)
+    )
+    num_games = len(games) // 2
+    seeds = slot_seeds(games[num_games:])
+    distributions = np.vstack([distributions, np.eye(num_games + 1)])
+
+    # The slots under each node are a contiguous range, found by walking down the
+    # leftmost and rightmost branches.
+    def slots(node: int) -> slice:
+        first = last = node
+        while first < num_games:
+            first, last = 2 * first + 1, 2 * last + 2
+
+        return slice(first - num_games, last - num_games + 1)
+
+    matrices = {}
+    rounds = np.zeros((num_games + 1, num_games + 1), dtype=np.int64)
+    meetings = np.zeros((num_games + 1, num_games + 1))
+    wins = np.zeros((num_games + 1, num_games + 1))
+
+    for i, game in enumerate(games[:num_games]):
+        if game.round not in matrices:
+            matrices[game.round] = left_win_matrix(
+                model.win_probabilities[game.round], seeds
+            )
+
+        left, right = slots(2 * i + 1), slots(2 * i + 2)
+        left_wins = matrices[game.round][left, right]
+        if results[i] >= 0:
+            # Only the teams that actually played can meet, and the winner is known.
+            left_wins = left_wins.copy()
+            left_wins[np.arange(left.start, left.stop) == results[i]] = 1.0
+            left_wins[:, np.arange(right.start, right.stop) == results[i]] = 0.0
+
+        meeting = np.outer(
+            distributions[2 * i + 1, left], distributions[2 * i + 2, right]
+        )
+        rounds[left, right] = rounds[right, left] = game.round
+        meetings[left, right] = meeting
+        meetings[right, left] = meeting.T
+        wins[left, right] = left_wins
+        wins[right, left] = 1.0 - left_wins.T
+
+    for matrix in (rounds, meetings, wins):
+        matrix.flags.writeable = False
+
+    return Matchups(rounds, meetings, wins)
+
+
+def matchups(
+    results: np.ndarray | None = None,
+    model: ProbabilityModel | None = None,
+    tournament_format: TournamentFormat = prediction_engine.NCAA_FORMAT,
+) -> Matchups:
+    """
+    Compute the chance of every pair of teams meeting, and of each winning if they do.
+
+    Meetings follow from the winner distributions of the two sides of each game, and
+    are cached the same way.
+
+    :param results: The winning slot of each game, or -1 for games that have not been
+        played. Defaults to no games played.
+    :param model: The probability model to use. Defaults to the active model.
+    :param tournament_format: The format of the tournament.
+    """
+    if results is None:
+        num_slots = len(tournament_format.regions) * len(tournament_format.seed_order)
+        results = np.full(num_slots - 1, -1)
+
+    return cached_matchups(
+        model or prediction_engine.active_model,
+        tournament_format,
+        tuple(int(winner) for winner in results),
+    )
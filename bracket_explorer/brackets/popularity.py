@@ -0,0 +1,192 @@
+"""
+Count how many saved brackets pick each team to win in each round.
+
+Counting picks directly means simulating every saved bracket, so the counts are kept in
+:class:`brackets.models.PickCount` and adjusted as brackets are created, changed and
+deleted. Signal handlers cover brackets saved and deleted through the ORM, including
+cascades. Code that creates or deletes brackets without sending signals, such as
+``bulk_create``, must call :func:`add_brackets` or :func:`remove_brackets` itself.
+
+Picks depend on the probability model as well as the brackets, so :func:`reconcile`
+recounts everything from scratch. Run it periodically to correct drift, and after
+changing the model.
+
+Picks are counted in the 64-team NCAA format that saved brackets are simulated in, so
+First Four games aren't counted.
+"""
+
+from collections.abc import Iterable
+from functools import cache, reduce
+from operator import or_
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from brackets import models, prediction_engine, routers
+from brackets.prediction_engine import GAME_ROUNDS, NUM_GAMES
+
+# Number of brackets simulated at once when recounting.
+BATCH_SIZE = 1000
+
+CONTRARIAN_PICKS = 10
+
+NUM_ROUNDS = int(GAME_ROUNDS.max())
+
+
+def count_picks(seeds: Iterable[int]) -> np.ndarray:
+    """
+    Count the picks of brackets with the given random seeds.
+
+    :returns: An array of shape ``(num_rounds + 1, num_slots)`` indexed by round
+        number, so row 0 is always empty.
+    """
+    counts = np.zeros((NUM_ROUNDS + 1, NUM_GAMES + 1), dtype=np.int64)
+    for seed in seeds:
+        winners = prediction_engine.winner_indices(prediction_engine.predict(str(seed)))
+        np.add.at(counts, (GAME_ROUNDS, winners), 1)
+
+    return counts
+
+
+def create_rows() -> None:
+    """
+    Create a zero count for every round and team that doesn't have one yet.
+    """
+    models.PickCount.objects.bulk_create(
+        [
+            models.PickCount(round=round, slot=slot)
+            for round in range(1, NUM_ROUNDS + 1)
+            for slot in range(NUM_GAMES + 1)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+# Rows are only ever created, so each process only needs to make sure of them once.
+ensure_rows = cache(create_rows)
+
+
+def apply_changes(changes: np.ndarray) -> None:
+    """
+    Add changes to the stored counts in a single update.
+
+    :param changes: The change to each count, shaped like :func:`count_picks`.
+    """
+    rounds, slots = np.nonzero(changes)
+    if not len(rounds):
+        return
+
+    ensure_rows()
+
+    cells = [
+        (int(round), int(slot), int(changes[round, slot]))
+        for round, slot in zip(rounds, slots, strict=True)
+    ]
+    models.PickCount.objects.filter(
+        reduce(or_, (Q(round=round, slot=slot) for round, slot, _ in cells))
+    ).update(
+        count=F("count")
+        + Case(
+            *(
+                When(round=round, slot=slot, then=Value(change))
+                for round, slot, change in cells
+            ),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        updated_at=Now(),
+    )
+
+
+def add_brackets(brackets: Iterable[models.Bracket]) -> None:
+    apply_changes(count_picks(bracket.random_seed for bracket in brackets))
+
+
+def remove_brackets(brackets: Iterable[models.Bracket]) -> None:
+    apply_changes(-count_picks(bracket.random_seed for bracket in brackets))
+
+
+def pick_counts() -> np.ndarray:
+    """
+    Read the stored counts, shaped like :func:`count_picks`.
+    """
+    counts = np.zeros((NUM_ROUNDS + 1, NUM_GAMES + 1), dtype=np.int64)
+    for round, slot, count in models.PickCount.objects.values_list(
+        "round", "slot", "count"
+    ):
+        counts[round, slot] = count
+
+    return counts
+
+
+def pick_shares(counts: np.ndarray) -> np.ndarray:
+    """
+    Turn counts into the share of the field making each pick.
+
+    Every bracket picks exactly one champion, so the size of the field is the total of
+    the last round.
+    """
+    brackets = counts[-1].sum()
+    if brackets <= 0:
+        return np.zeros(counts.shape)
+
+    return counts / brackets
+
+
+def contrarian_picks(
+    shares: np.ndarray, advancement: np.ndarray, limit: int = CONTRARIAN_PICKS
+) -> list[tuple[int, int, float, float]]:
+    """
+    Find the picks the field undervalues the most compared to their odds.
+
+    :param shares: The share of the field making each pick, from :func:`pick_shares`.
+    :param advancement: The odds of each pick, from
+        :func:`brackets.odds.advancement_odds`.
+    :returns: ``(round, slot, share, odds)`` for each pick, best value first.
+    """
+    edge = advancement - shares
+    order = np.argsort(-edge, axis=None, kind="stable")[:limit]
+    rounds, slots = np.unravel_index(order, edge.shape)
+
+    return [
+        (
+            int(round),
+            int(slot),
+            float(shares[round, slot]),
+            float(advancement[round, slot]),
+        )
+        for round, slot in zip(rounds, slots, strict=True)
+        if edge[round, slot] > 0
+    ]
+
+
+def reconcile() -> int:
+    """
+    Recount every bracket's picks and overwrite the stored counts.
+
+    Brackets saved while the recount is running may be counted twice or not at all,
+    which the next recount corrects.
+
+    :returns: The total amount the stored counts were off by.
+    """
+    with routers.use_primary():
+        seeds = models.Bracket.objects.order_by().values_list("random_seed", flat=True)
+        counts = count_picks(seeds.iterator(chunk_size=BATCH_SIZE))
+
+        create_rows()
+        with transaction.atomic():
+            rows = list(models.PickCount.objects.select_for_update())
+            now = timezone.now()
+            drift = 0
+            for row in rows:
+                expected = int(counts[row.round, row.slot])
+                drift += abs(row.count - expected)
+                row.count = expected
+                row.updated_at = now
+
+            models.PickCount.objects.bulk_update(rows, ["count", "updated_at"])
+
+    return drift
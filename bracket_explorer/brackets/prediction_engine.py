@@ -1,11 +1,17 @@
 # NCAA Bracket predictor
 
+import hashlib
+import json
 import random
 from collections import defaultdict
-from dataclasses import dataclass
-from enum import Enum, unique
+from dataclasses import dataclass, field, replace
+from enum import Enum, IntEnum, unique
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 
+import numpy as np
+
 
 @unique
 class Regions(Enum):
@@ -19,11 +25,14 @@ class Regions(Enum):
 
 
 @unique
-class Round(Enum):
+class Round(IntEnum):
     # NOTE: There is code that relies on the numeric comparisons of round values, and
-    # the fact that later rounds have higher values than lower ones.
+    # the fact that later rounds have higher values than lower ones. Rounds are plain
+    # integers so that tournaments with more rounds than the NCAA tournament can number
+    # their games the same way.
 
-    SEEDING = 0
+    SEEDING = -1
+    FIRST_FOUR = 0
     ROUND_OF_64 = 1
     ROUND_OF_32 = 2
     SWEET_16 = 3
@@ -35,6 +44,8 @@ class Round(Enum):
         match self:
             case Round.SEEDING:
                 return "Seeding"
+            case Round.FIRST_FOUR:
+                return "First Four"
             case Round.ROUND_OF_64:
                 return "Round of 64"
             case Round.ROUND_OF_32:
@@ -162,10 +173,88 @@ WIN_PROBABILITIES = {
 }
 
 
+@dataclass(frozen=True)
+class ProbabilityModel:
+    """
+    A table of win probabilities by seed for each round.
+
+    The version identifies the table, so anything derived from a model can be cached
+    by its version. Versions of tables end with :func:`table_digest`, so two different
+    tables never share a version even if they were given the same name. Models compare
+    and hash by version alone, so caches keyed on a model are shared by every copy of
+    the same table, such as a table loaded twice.
+    """
+
+    version: str
+    win_probabilities: dict[int, list[float]] = field(compare=False)
+
+
+# Number of hex digits of a table's hash kept in its version.
+DIGEST_LENGTH = 12
+
+
+def table_digest(win_probabilities: dict[int, list[float]]) -> str:
+    """
+    Hash the probabilities of a table, so that tables with the same contents get the
+    same digest and any change to a probability changes it.
+    """
+    data = json.dumps(
+        {
+            int(round): [float(p) for p in probabilities]
+            for round, probabilities in sorted(win_probabilities.items())
+        }
+    )
+
+    return hashlib.sha256(data.encode()).hexdigest()[:DIGEST_LENGTH]
+
+
+BUILTIN_MODEL = ProbabilityModel(
+    f"builtin-{table_digest(WIN_PROBABILITIES)}", WIN_PROBABILITIES
+)
+
+# The model used when one isn't provided explicitly.
+active_model = BUILTIN_MODEL
+
+
+def load_model(path: Path) -> ProbabilityModel:
+    """
+    Load a probability table produced by the calibration pipeline.
+
+    The model's version is the table's version counter followed by the digest of its
+    probabilities.
+
+    :param path: The path of the JSON table.
+    :raises ValueError: If the table doesn't have probabilities for every round and
+        seed.
+    """
+    data = json.loads(path.read_text())
+
+    win_probabilities = {}
+    for round in Round:
+        if round < Round.ROUND_OF_64:
+            continue
+
+        probabilities = data["probabilities"].get(round.name)
+        if probabilities is None or len(probabilities) != 16:
+            raise ValueError(f"{path} is missing probabilities for the {round}.")
+
+        win_probabilities[round] = [float(p) for p in probabilities]
+
+    return ProbabilityModel(
+        f"{data['version']}-{table_digest(win_probabilities)}", win_probabilities
+    )
+
+
+def set_active_model(model: ProbabilityModel) -> None:
+    global active_model
+
+    active_model = model
+
+
 @dataclass
 class Team:
     seed: int
-    region: Regions
+    region: Regions | str
 
     def __str__(self) -> str:
         return f"{self.seed} seed from the {self.region}"
@@ -173,7 +262,7 @@ class Team:
 
 @dataclass
 class Game:
-    round: Round
+    round: int
 
     left: Optional["Game"] = None
     right: Optional["Game"] = None
@@ -193,7 +282,166 @@ class Prediction:
     championship: Game
 
 
-def region_teams(region: Regions) -> list[Team]:
+NCAA_SEED_ORDER = (1, 16, 8, 9, 5, 12, 4, 13, 6, 11, 3, 14, 7, 10, 2, 15)
+
+
+def standard_seed_order(num_seeds: int) -> tuple[int, ...]:
+    """
+    Order seeds so that the best remaining seeds meet as late as possible.
+
+    :param num_seeds: The number of seeds, which must be a power of two.
+    """
+    order = [1]
+    while len(order) < num_seeds:
+        size = 2 * len(order)
+        order = [s for seed in order for s in (seed, size + 1 - seed)]
+
+    return tuple(order)
+
+
+@dataclass(frozen=True)
+class TournamentFormat:
+    """
+    A description of a single-elimination tournament.
+
+    Every region seeds the same number of teams, and the region champions meet in a
+    balanced bracket described by ``pairings``. A pairing is either a region or a pair
+    of pairings, so the NCAA's final rounds are ``((East, South), (West, Midwest))``.
+    """
+
+    name: str
+    regions: tuple[Regions | str, ...]
+    pairings: tuple | Regions | str
+    # The order teams are listed in within each region, such that adjacent teams meet
+    # in the first round.
+    seed_order: tuple[int, ...]
+    # Region and seed of each slot filled by the winner of a play-in game between two
+    # teams on that seed line.
+    play_ins: tuple[tuple[Regions | str, int], ...] = ()
+    # Display names for the main rounds, starting with the first round.
+    round_names: tuple[str, ...] = ()
+
+    def __post_init__(self):
+        num_seeds = len(self.seed_order)
+        if num_seeds < 2 or num_seeds & (num_seeds - 1):
+            raise ValueError("Regions must have a power of two number of teams.")
+
+        if sorted(self.seed_order) != list(range(1, num_seeds + 1)):
+            raise ValueError("The seed order must list each seed exactly once.")
+
+        if sorted(map(str, self.paired_regions())) != sorted(map(str, self.regions)):
+            raise ValueError("Every region must appear in the pairings exactly once.")
+
+        for region, seed in self.play_ins:
+            if region not in self.regions or not 1 <= seed <= num_seeds:
+                raise ValueError(f"Invalid play-in slot: {seed} seed in {region}.")
+
+    def paired_regions(self, pairing=None) -> list[Regions | str]:
+        """
+        List regions in the order they appear in the pairings.
+
+        :raises ValueError: If the pairings are not balanced.
+        """
+        if pairing is None:
+            pairing = self.pairings
+
+        if not isinstance(pairing, tuple):
+            return [pairing]
+
+        left, right = pairing
+        left_regions, right_regions = (
+            self.paired_regions(left),
+            self.paired_regions(right),
+        )
+        if len(left_regions) != len(right_regions):
+            raise ValueError("Pairings must form a balanced bracket.")
+
+        return left_regions + right_regions
+
+    @property
+    def region_rounds(self) -> int:
+        return len(self.seed_order).bit_length() - 1
+
+    @property
+    def num_rounds(self) -> int:
+        return self.region_rounds + len(self.regions).bit_length() - 1
+
+    def round_name(self, round: int) -> str:
+        if round == Round.FIRST_FOUR:
+            return str(Round.FIRST_FOUR)
+
+        if round <= len(self.round_names):
+            return self.round_names[round - 1]
+
+        remaining = self.num_rounds - round
+        if remaining == 0:
+            return "Championship"
+        if remaining == 1:
+            return "Semifinals"
+        if remaining == 2:
+            return "Quarterfinals"
+
+        return f"Round of {2 ** (remaining + 1)}"
+
+
+NCAA_FORMAT = TournamentFormat(
+    name="ncaa",
+    regions=(Regions.EAST, Regions.SOUTH, Regions.WEST, Regions.MIDWEST),
+    pairings=((Regions.EAST, Regions.SOUTH), (Regions.WEST, Regions.MIDWEST)),
+    seed_order=NCAA_SEED_ORDER,
+    round_names=tuple(str(r) for r in Round if r >= Round.ROUND_OF_64),
+)
+
+# The full 68-team NCAA tournament, where the First Four decide two 16 seeds and the
+# last two at-large 11 seeds. The regions hosting them change every year.
+NCAA_FIRST_FOUR_FORMAT = replace(
+    NCAA_FORMAT,
+    name="ncaa-first-four",
+    play_ins=(
+        (Regions.EAST, 16),
+        (Regions.SOUTH, 11),
+        (Regions.WEST, 16),
+        (Regions.MIDWEST, 11),
+    ),
+)
+
+
+def standard_format(
+    name: str, num_teams: int, num_regions: int = 4
+) -> TournamentFormat:
+    """
+    Describe a tournament of evenly seeded regions paired off in order.
+
+    :param num_teams: The total number of teams, which must be a power of two.
+    :param num_regions: The number of regions, which must be a power of two.
+    """
+    if num_regions < 1 or num_regions & (num_regions - 1):
+        raise ValueError("The number of regions must be a power of two.")
+
+    num_seeds, remainder = divmod(num_teams, num_regions)
+    if remainder or num_seeds < 2 or num_seeds & (num_seeds - 1):
+        raise ValueError(
+            "Teams must split evenly into regions with a power of two number of "
+            "teams each."
+        )
+
+    regions = tuple(f"Region {i + 1}" for i in range(num_regions))
+
+    pairings = list(regions)
+    while len(pairings) > 1:
+        pairings = list(zip(pairings[::2], pairings[1::2], strict=True))
+
+    return TournamentFormat(
+        name=name,
+        regions=regions,
+        pairings=pairings[0],
+        seed_order=standard_seed_order(num_seeds),
+    )
+
+
+def region_teams(
+    region: Regions | str, seed_order: tuple[int, ...] = NCAA_SEED_ORDER
+) -> list[Team]:
     """
     Construct team representations for a region.
 
@@ -201,44 +449,98 @@ def region_teams(region: Regions) -> list[Team]:
     balanced tree can be created with these teams as the leaf nodes, and the games will
     be played out as they are in the actual tournament.
     """
-    seed_order = [1, 16, 8, 9, 5, 12, 4, 13, 6, 11, 3, 14, 7, 10, 2, 15]
-
     return [Team(seed, region) for seed in seed_order]
 
 
-def build_tournament() -> Game:
+def build_tournament(tournament_format: TournamentFormat = NCAA_FORMAT) -> Game:
     """
-    Construct the tree of games representing the NCAA tournament.
+    Construct the tree of games representing a tournament.
+
+    :param tournament_format: The format of the tournament. Defaults to the NCAA
+        tournament without play-in games. Use :data:`NCAA_FIRST_FOUR_FORMAT` for the
+        68-team tournament.
     """
     # The easiest way to think about building the tournament is to construct each
-    # regional tournament, then create the semis and finals manually with the desired
-    # region matchups.
+    # regional tournament, then pair off the region finals as the format describes.
+
+    play_ins = set(tournament_format.play_ins)
 
     region_finals = {}
-    for region in Regions:
-        games = [Game(Round.SEEDING, winner=t) for t in region_teams(region)]
+    for region in tournament_format.regions:
+        games = []
+        for team in region_teams(region, tournament_format.seed_order):
+            slot = Game(Round.SEEDING, winner=team)
+            if (region, team.seed) in play_ins:
+                other = Game(Round.SEEDING, winner=Team(team.seed, region))
+                slot = Game(Round.FIRST_FOUR, left=slot, right=other)
+
+            games.append(slot)
 
         round_num = 1
         while len(games) > 1:
             new_games = []
             for left, right in zip(games[::2], games[1::2], strict=True):
-                new_games.append(Game(Round(round_num), left=left, right=right))
+                new_games.append(Game(round_for(round_num), left=left, right=right))
 
             round_num += 1
             games = new_games
 
         region_finals[region] = games[0]
 
-    semis = [
-        Game(Round.FINAL_4, region_finals[Regions.EAST], region_finals[Regions.SOUTH]),
-        Game(
-            Round.FINAL_4, region_finals[Regions.WEST], region_finals[Regions.MIDWEST]
-        ),
-    ]
+    def build_pairing(pairing) -> Game:
+        if not isinstance(pairing, tuple):
+            return region_finals[pairing]
+
+        left, right = build_pairing(pairing[0]), build_pairing(pairing[1])
+
+        return Game(round_for(left.round + 1), left, right)
+
+    return build_pairing(tournament_format.pairings)
+
+
+def round_for(round_num: int) -> int:
+    """
+    Use the named round for round numbers the NCAA tournament has.
+    """
+    try:
+        return Round(round_num)
+    except ValueError:
+        return round_num
+
 
-    finals = Game(Round.CHAMPIONSHIP, *semis)
+@lru_cache
+def model_for_format(
+    model: ProbabilityModel, tournament_format: TournamentFormat
+) -> ProbabilityModel:
+    """
+    Adapt a probability model to a tournament format.
 
-    return finals
+    Rounds are matched to the model's rounds by how far they are from the championship,
+    with any rounds before the round of 64 using the round of 64's probabilities. Seeds
+    past the end of the model's table use the worst seed's probability. Play-in games
+    are between teams on the same seed line, so they are treated as coin flips.
+    """
+    num_rounds = tournament_format.num_rounds
+    num_seeds = len(tournament_format.seed_order)
+    if (
+        num_rounds == Round.CHAMPIONSHIP
+        and num_seeds <= len(model.win_probabilities[Round.ROUND_OF_64])
+        and not tournament_format.play_ins
+    ):
+        return model
+
+    win_probabilities = {Round.FIRST_FOUR: [0.5] * num_seeds}
+    for round_num in range(1, num_rounds + 1):
+        model_round = max(
+            Round.ROUND_OF_64, Round.CHAMPIONSHIP - (num_rounds - round_num)
+        )
+        probabilities = model.win_probabilities[model_round]
+        padding = [probabilities[-1]] * max(0, num_seeds - len(probabilities))
+        win_probabilities[round_for(round_num)] = probabilities + padding
+
+    return ProbabilityModel(
+        f"{model.version}:{tournament_format.name}", win_probabilities
+    )
 
 
 def win_loss(rand: random.Random, probability: float) -> bool:
@@ -254,7 +556,11 @@ def win_loss(rand: random.Random, probability: float) -> bool:
 
 
 def pick_winner(
-    random: random.Random, team_a: Team, team_b: Team, round: Round
+    random: random.Random,
+    team_a: Team,
+    team_b: Team,
+    round: Round,
+    model: ProbabilityModel | None = None,
 ) -> Team:
     """
     Pick a winning team for a particular game.
@@ -263,9 +569,10 @@ def pick_winner(
     :param team_a: The first team from the game.
     :param team_b: The second team from the game.
     :param round: The round the game is being played in.
+    :param model: The probability model to use. Defaults to the active model.
     :returns: The team picked to be the winner.
     """
-    probabilities = WIN_PROBABILITIES[round]
+    probabilities = (model or active_model).win_probabilities[round]
 
     teams = [team_a, team_b]
     teams.sort(key=lambda t: t.seed)
@@ -282,12 +589,16 @@ def pick_winner(
     return high
 
 
-def simulate_game(random: random.Random, game: Game) -> Game:
+def simulate_game(
+    random: random.Random, game: Game, model: ProbabilityModel | None = None
+) -> Game:
     """
     Simulate a game to predict winners.
 
     If the games leading to this one have not been simulated yet, they will be simulated
     first.
+
+    :param model: The probability model to use. Defaults to the active model.
     """
 
     if not game.left or not game.right:
@@ -297,20 +608,43 @@ def simulate_game(random: random.Random, game: Game) -> Game:
     # they have winners before computing the result for this node.
 
     if not game.left.winner:
-        game.left = simulate_game(random, game.left)
+        game.left = simulate_game(random, game.left, model)
 
     if not game.right.winner:
-        game.right = simulate_game(random, game.right)
+        game.right = simulate_game(random, game.right, model)
 
-    game.winner = pick_winner(random, game.left.winner, game.right.winner, game.round)
+    game.winner = pick_winner(
+        random, game.left.winner, game.right.winner, game.round, model
+    )
 
     return game
 
 
+def predict(
+    seed: str,
+    model: ProbabilityModel | None = None,
+    tournament_format: TournamentFormat = NCAA_FORMAT,
+) -> Game:
+    """
+    Build and simulate a tournament from a random seed.
+
+    :param seed: The seed for the random generator. Seeds are used as strings so that
+        a seed from a URL and the same seed stored as an integer agree.
+    :param model: The probability model to use. Defaults to the active model.
+    :param tournament_format: The format of the tournament to simulate.
+    :returns: The simulated championship game.
+    """
+    model = model_for_format(model or active_model, tournament_format)
+
+    return simulate_game(
+        random.Random(seed), build_tournament(tournament_format), model
+    )
+
+
 def collect_games_by_round(
     game: Game,
-    collection: dict[Round, list[Game]] = None,
-    lowest_round: Round = Round.ROUND_OF_64,
+    collection: dict[int, list[Game]] = None,
+    lowest_round: int = Round.ROUND_OF_64,
 ):
     """
     Collect games into a structure that's easier to display results from.
@@ -328,7 +662,7 @@ def collect_games_by_round(
     if collection is None:
         collection = defaultdict(list)
 
-    if game is None or game.round.value < lowest_round.value:
+    if game is None or game.round < lowest_round:
         return
 
     collect_games_by_round(game.left, collection, lowest_round)
@@ -339,6 +673,61 @@ def collect_games_by_round(
     return dict(collection)
 
 
+def level_order(game: Game) -> list[Game]:
+    """
+    Flatten a balanced game tree into heap order.
+
+    The root game is at index 0, and the children of the game at index ``i`` are at
+    ``2 * i + 1`` and ``2 * i + 2``. The slots seeding the tree make up the final half
+    of the list. A slot is either a team or a play-in game, whose own teams are not
+    included.
+    """
+    games = [game]
+    for node in games:
+        if node.round > Round.FIRST_FOUR:
+            games.append(node.left)
+            games.append(node.right)
+
+    return games
+
+
+def game_rounds(num_games: int) -> np.ndarray:
+    """
+    Compute the round of each game in a heap ordered tournament.
+
+    Rounds are numbered from 1 for the first round up to the championship.
+    """
+    num_rounds = (num_games + 1).bit_length() - 1
+    depths = np.log2(np.arange(1, num_games + 1)).astype(np.int64)
+
+    return num_rounds - depths
+
+
+# The structure of the NCAA tournament that saved brackets are simulated in, in heap
+# order. It is shared, so it must not be modified.
+TOURNAMENT = level_order(build_tournament())
+NUM_GAMES = len(TOURNAMENT) // 2
+GAME_ROUNDS = game_rounds(NUM_GAMES)
+GAME_ROUNDS.flags.writeable = False
+
+
+def winner_indices(championship: Game) -> list[int]:
+    """
+    Summarize a simulated tournament as the team that won each game.
+
+    Games are in heap order as returned by :func:`level_order`, and each winner is
+    identified by the index of the slot it came from among the tree's leaves.
+    """
+    games = level_order(championship)
+    first_slot = len(games) // 2
+
+    # Winners are the same team objects as the slots they advanced from, and teams in
+    # play-in slots share a region and seed, so teams are matched by identity.
+    slots = {id(game.winner): i for i, game in enumerate(games[first_slot:])}
+
+    return [slots[id(game.winner)] for game in games[:first_slot]]
+
+
 def collect_results(championship: Game) -> Prediction:
     """
     Collect results into a dictionary structure that's easier to iterate through.
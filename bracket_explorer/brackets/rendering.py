@@ -0,0 +1,328 @@
+"""
+Render bracket predictions as SVG diagrams.
+
+The geometry of a bracket only depends on its size, so box positions and connector
+paths are computed once per size and reused. Rendering a bracket then only fills in
+the team labels and highlights. Regional fragments are additionally cached by the
+seeds that won each game, because many random seeds produce identical regional results.
+"""
+
+from dataclasses import dataclass
+from functools import cache, lru_cache
+
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+
+from brackets.prediction_engine import Game, Round, Team, level_order
+
+BOX_WIDTH = 80
+BOX_HEIGHT = 18
+COLUMN_WIDTH = 96
+ROW_HEIGHT = 22
+TITLE_HEIGHT = 24
+REGION_GAP = 32
+
+# Number of distinct regional fragments to keep rendered.
+REGION_CACHE_SIZE = 4096
+
+STYLE = (
+    "<style>"
+    ".box rect{fill:#fff;stroke:#9ca3af}"
+    ".box text{font:12px sans-serif;dominant-baseline:central}"
+    ".upset rect{fill:#fef3c7;stroke:#d97706}"
+    ".play-in rect{stroke-dasharray:3 2}"
+    ".champion rect{fill:#dcfce7;stroke:#16a34a}"
+    ".title{font:bold 14px sans-serif}"
+    ".connector{fill:none;stroke:#d1d5db}"
+    "</style>"
+)
+
+BOX_TEMPLATE = (
+    '<g class="{{cls}}"><rect x="{x}" y="{y}" width="{width}" height="{height}"/>'
+    '<text x="{text_x}" y="{text_y}">{{label}}</text></g>'
+)
+
+
+@dataclass(frozen=True)
+class RegionTemplate:
+    """
+    Pre-computed geometry for one side of a regional bracket.
+    """
+
+    # Positions of each game's box in heap order.
+    positions: tuple[tuple[int, int], ...]
+    # Format strings for each box, with only the label and class left to fill in.
+    boxes: tuple[str, ...]
+    connectors: str
+    width: int
+    height: int
+
+
+@dataclass(frozen=True)
+class BracketLayout:
+    """
+    Pre-computed geometry for a full bracket.
+
+    The first half of the bracket advances from left to right, and the second half
+    from right to left, meeting at the championship in the middle.
+    """
+
+    # Offset and orientation of each region, in the order their teams are seeded.
+    regions: tuple[tuple[int, int, bool], ...]
+    # Format strings for the games between region champions, in heap order.
+    boxes: tuple[str, ...]
+    connectors: str
+    width: int
+    height: int
+
+
+def box_template(x: int, y: int) -> str:
+    return BOX_TEMPLATE.format(
+        x=x,
+        y=y,
+        width=BOX_WIDTH,
+        height=BOX_HEIGHT,
+        text_x=x + 6,
+        text_y=y + BOX_HEIGHT // 2,
+    )
+
+
+def connector(child: tuple[int, int], parent: tuple[int, int]) -> str:
+    """
+    Build the path data for an elbow connecting a child box to its parent box.
+    """
+    (child_x, child_y), (parent_x, parent_y) = child, parent
+    if child_x < parent_x:
+        start, end = child_x + BOX_WIDTH, parent_x
+    else:
+        start, end = child_x, parent_x + BOX_WIDTH
+
+    middle = (start + end) // 2
+    half = BOX_HEIGHT // 2
+
+    return f"M{start} {child_y + half}H{middle}V{parent_y + half}H{end}"
+
+
+@cache
+def region_template(depth: int, mirrored: bool) -> RegionTemplate:
+    """
+    Compute the geometry for a region with ``depth`` rounds of games.
+
+    :param depth: The number of rounds played in the region.
+    :param mirrored: Whether the region advances from right to left.
+    """
+    num_teams = 2**depth
+    first_team = num_teams - 1
+    positions = [(0, 0)] * (2 * num_teams - 1)
+
+    for i in range(first_team, len(positions)):
+        positions[i] = (0, (i - first_team) * ROW_HEIGHT)
+
+    for i in reversed(range(first_team)):
+        (x, left_y), (_, right_y) = positions[2 * i + 1], positions[2 * i + 2]
+        positions[i] = (x + COLUMN_WIDTH, (left_y + right_y) // 2)
+
+    if mirrored:
+        positions = [(depth * COLUMN_WIDTH - x, y) for x, y in positions]
+
+    connectors = "".join(
+        connector(positions[i], positions[(i - 1) // 2])
+        for i in range(1, len(positions))
+    )
+
+    return RegionTemplate(
+        positions=tuple(positions),
+        boxes=tuple(box_template(x, y) for x, y in positions),
+        connectors=f'<path class="connector" d="{connectors}"/>',
+        width=depth * COLUMN_WIDTH + BOX_WIDTH,
+        height=(num_teams - 1) * ROW_HEIGHT + BOX_HEIGHT,
+    )
+
+
+@cache
+def bracket_layout(num_rounds: int, region_rounds: int) -> BracketLayout:
+    """
+    Compute the geometry for a bracket.
+
+    :param num_rounds: The number of rounds in the tournament.
+    :param region_rounds: The number of rounds played within each region. Must be less
+        than the number of rounds so that each half of the bracket has a region.
+    """
+    num_slots = 2**num_rounds
+    first_slot = num_slots - 1
+    region_slots = 2**region_rounds
+    region_height = region_template(region_rounds, mirrored=False).height
+    center_x = num_rounds * COLUMN_WIDTH
+
+    positions = [(0, 0)] * (2 * num_slots - 1)
+    for slot in range(num_slots):
+        mirrored = slot >= num_slots // 2
+        region, row = divmod(slot % (num_slots // 2), region_slots)
+        positions[first_slot + slot] = (
+            2 * center_x if mirrored else 0,
+            TITLE_HEIGHT
+            + region * (region_height + REGION_GAP + TITLE_HEIGHT)
+            + row * ROW_HEIGHT,
+        )
+
+    for i in reversed(range(first_slot)):
+        (left_x, left_y), (_, right_y) = positions[2 * i + 1], positions[2 * i + 2]
+        if i == 0:
+            x = center_x
+        elif left_x < center_x:
+            x = left_x + COLUMN_WIDTH
+        else:
+            x = left_x - COLUMN_WIDTH
+
+        positions[i] = (x, (left_y + right_y) // 2)
+
+    num_regions = num_slots // region_slots
+    regions = []
+    for region in range(num_regions):
+        x, y = positions[first_slot + region * region_slots]
+        mirrored = x > center_x
+        if mirrored:
+            x -= region_rounds * COLUMN_WIDTH
+
+        regions.append((x, y, mirrored))
+
+    # Boxes and connectors are only needed for games between region champions, since
+    # the regions draw their own.
+    first_region_final = num_regions - 1
+    connectors = "".join(
+        connector(positions[i], positions[(i - 1) // 2])
+        for i in range(1, first_region_final + num_regions)
+    )
+
+    return BracketLayout(
+        regions=tuple(regions),
+        boxes=tuple(box_template(x, y) for x, y in positions[:first_region_final]),
+        connectors=f'<path class="connector" d="{connectors}"/>',
+        width=2 * center_x + BOX_WIDTH,
+        height=max(y for _, y in positions) + BOX_HEIGHT,
+    )
+
+
+def region_rounds_for(slots: list[Game], max_rounds: int) -> int:
+    """
+    Determine how many rounds are played within each region.
+
+    :param slots: The slots seeding the tournament, in heap order.
+    :param max_rounds: The maximum number of regional rounds to report.
+    """
+    rounds = 0
+    while rounds < max_rounds:
+        size = 2**rounds
+        if any(
+            slots[i].winner.region != slots[i + size].winner.region
+            for i in range(0, len(slots), 2 * size)
+        ):
+            break
+
+        rounds += 1
+
+    return rounds
+
+
+def box_class(seeds: tuple[int, ...], index: int) -> str:
+    """
+    Determine the highlight class for the box at ``index`` of a region.
+
+    A game's box is highlighted as an upset if the winner was seeded lower than the
+    team it beat.
+    """
+    child = 2 * index + 1
+    if child >= len(seeds):
+        return "box"
+
+    winner = seeds[index]
+    loser = seeds[child + 1] if seeds[child] == winner else seeds[child]
+
+    return "box upset" if winner > loser else "box"
+
+
+def game_class(game: Game) -> str:
+    loser = game.right.winner if game.left.winner is game.winner else game.left.winner
+
+    return "box upset" if game.winner.seed > loser.seed else "box"
+
+
+def team_label(team: Team) -> str:
+    return escape(f"{team.seed} {team.region}")
+
+
+@lru_cache(maxsize=REGION_CACHE_SIZE)
+def render_region(
+    seeds: tuple[int, ...], play_ins: tuple[int, ...], mirrored: bool
+) -> str:
+    """
+    Render the boxes for a single region.
+
+    :param seeds: The seed of the winner of each of the region's games, and then the
+        seed of each team in the region, in heap order.
+    :param play_ins: The indices of slots that were decided by play-in games.
+    :param mirrored: Whether the region advances from right to left.
+    """
+    depth = (len(seeds) + 1).bit_length() - 2
+    template = region_template(depth, mirrored)
+
+    boxes = "".join(
+        box.format(
+            cls="box play-in" if i in play_ins else box_class(seeds, i), label=seed
+        )
+        for i, (box, seed) in enumerate(zip(template.boxes, seeds, strict=True))
+    )
+
+    return template.connectors + boxes
+
+
+def render_bracket(championship: Game) -> SafeString:
+    """
+    Render a simulated tournament as an SVG diagram.
+
+    The layout is derived from the shape of the tree, so any tournament format can be
+    rendered. Regions are the largest subtrees whose teams all share a region.
+
+    :param championship: The championship game of a fully simulated tournament.
+    :returns: The SVG markup for the bracket.
+    """
+    games = level_order(championship)
+    num_rounds = len(games).bit_length() - 1
+    region_rounds = region_rounds_for(games[len(games) // 2 :], num_rounds - 1)
+    layout = bracket_layout(num_rounds, region_rounds)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" class="bracket" '
+        f'viewBox="0 0 {layout.width} {layout.height}">',
+        STYLE,
+        layout.connectors,
+    ]
+
+    region_width = region_template(region_rounds, mirrored=False).width
+    first_region_final = len(layout.regions) - 1
+    for i, (x, y, mirrored) in enumerate(layout.regions):
+        region_games = level_order(games[first_region_final + i])
+
+        title_x = x + region_width if mirrored else x
+        anchor = "end" if mirrored else "start"
+        parts.append(
+            f'<text class="title" x="{title_x}" y="{y - 8}" text-anchor="{anchor}">'
+            f"{escape(region_games[-1].winner.region)}</text>"
+        )
+
+        seeds = tuple(game.winner.seed for game in region_games)
+        play_ins = tuple(
+            i for i, game in enumerate(region_games) if game.round == Round.FIRST_FOUR
+        )
+        parts.append(f'<g transform="translate({x} {y})">')
+        parts.append(render_region(seeds, play_ins, mirrored))
+        parts.append("</g>")
+
+    for i, box in enumerate(layout.boxes):
+        game = games[i]
+        cls = "box champion" if i == 0 else game_class(game)
+        parts.append(box.format(cls=cls, label=team_label(game.winner)))
+
+    parts.append("</svg>")
+
+    return mark_safe("".join(parts))
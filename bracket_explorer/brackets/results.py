@@ -0,0 +1,252 @@
+"""
+Record actual tournament results and keep scores and odds up to date.
+
+When a result is recorded, every saved bracket is rescored and the odds of each team
+advancing are recomputed given the results so far. Browsers following the tournament
+are sent only what changed: the result itself, the points it was worth, the new top of
+the leaderboard, and the odds that moved.
+
+Saved brackets are always simulated in the 64-team NCAA format, so results are recorded
+for its games only and First Four games aren't tracked.
+"""
+
+from dataclasses import dataclass
+from uuid import UUID
+
+import numpy as np
+from django.db import transaction
+
+from brackets import events, models, odds, prediction_engine, routers
+from brackets.prediction_engine import GAME_ROUNDS, NUM_GAMES, TOURNAMENT
+
+# Points for a correct pick, indexed by round number.
+POINTS_PER_ROUND = (0, 10, 20, 40, 80, 160, 320)
+
+LEADERBOARD_SIZE = 25
+
+# Decimal places odds are rounded to. Only changes that survive rounding are sent.
+ODDS_PRECISION = 4
+
+# Number of brackets rescored at once.
+SCORING_BATCH_SIZE = 1000
+
+
+def slot_labels() -> list[str]:
+    return [
+        f"{slot.winner.seed} {slot.winner.region}" for slot in TOURNAMENT[NUM_GAMES:]
+    ]
+
+
+def game_points() -> np.ndarray:
+    return np.asarray(POINTS_PER_ROUND)[GAME_ROUNDS]
+
+
+def current_results() -> np.ndarray:
+    """
+    :returns: The winning slot of each game, or -1 for games that haven't been played.
+    """
+    results = np.full(NUM_GAMES, -1)
+    for game, winner in models.GameResult.objects.values_list("game", "winner"):
+        results[game] = winner
+
+    return results
+
+
+def score(winners: np.ndarray, results: np.ndarray) -> int:
+    return int(game_points() @ (np.asarray(winners) == results))
+
+
+def find_game(slot: int, round: int) -> int:
+    """
+    Find the game a team plays in a round, if it gets that far.
+
+    :param slot: The slot the team was seeded into.
+    :param round: The round number, starting from 1 for the first round.
+    """
+    game = NUM_GAMES + slot
+    for _ in range(round):
+        game = (game - 1) // 2
+
+    return game
+
+
+def validate_result(results: np.ndarray, game: int, winner: int) -> None:
+    """
+    :raises ValueError: If the winner couldn't have played in the game.
+    """
+    if not 0 <= game < NUM_GAMES or not 0 <= winner <= NUM_GAMES:
+        raise ValueError(f"Invalid game {game} or winner {winner}.")
+
+    round = GAME_ROUNDS[game]
+    if find_game(winner, round) != game:
+        raise ValueError(f"Slot {winner} doesn't play in game {game}.")
+
+    if round > 1:
+        previous = find_game(winner, round - 1)
+        if results[previous] >= 0 and results[previous] != winner:
+            raise ValueError(f"Slot {winner} was eliminated before game {game}.")
+
+
+@dataclass(frozen=True)
+class SimulatedBrackets:
+    """
+    The winners picked by saved brackets, simulated ahead of rescoring them.
+    """
+
+    # The row of ``winners`` for each bracket's ID and seed.
+    rows: dict[tuple[UUID, int], int]
+    winners: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "SimulatedBrackets":
+        return cls({}, np.empty((0, NUM_GAMES), dtype=np.uint8))
+
+
+def simulate_winners(seeds: list[int]) -> np.ndarray:
+    """
+    Simulate the winner of each game of the brackets with the given seeds.
+
+    :returns: An array of shape ``(brackets, games)``.
+    """
+    winners = np.empty((len(seeds), NUM_GAMES), dtype=np.uint8)
+    for i, seed in enumerate(seeds):
+        winners[i] = prediction_engine.winner_indices(
+            prediction_engine.predict(str(seed))
+        )
+
+    return winners
+
+
+def simulate_brackets() -> SimulatedBrackets:
+    """
+    Simulate every saved bracket, which is the slow part of rescoring them.
+    """
+    with routers.use_primary():
+        keys = list(
+            models.Bracket.objects.order_by()
+            .values_list("id", "random_seed")
+            .iterator(chunk_size=SCORING_BATCH_SIZE)
+        )
+
+    return SimulatedBrackets(
+        {key: row for row, key in enumerate(keys)},
+        simulate_winners([seed for _, seed in keys]),
+    )
+
+
+def rescore_batch(
+    batch: list[tuple[UUID, int, int]],
+    results: np.ndarray,
+    simulated: SimulatedBrackets,
+) -> int:
+    """
+    Rescore a batch of ``(id, seed, score)`` rows, simulating brackets that weren't
+    simulated beforehand.
+
+    :returns: The number of brackets whose score changed.
+    """
+    rows = np.array(
+        [simulated.rows.get((id, seed), -1) for id, seed, _ in batch], dtype=np.int64
+    )
+    missing = rows < 0
+
+    winners = np.empty((len(batch), NUM_GAMES), dtype=np.uint8)
+    winners[~missing] = simulated.winners[rows[~missing]]
+    winners[missing] = simulate_winners(
+        [batch[i][1] for i in np.flatnonzero(missing).tolist()]
+    )
+
+    # Unplayed games have a result of -1, which never matches a pick.
+    scores = (winners == results) @ game_points()
+
+    changed = [
+        models.Bracket(id=id, score=new_score)
+        for (id, _, old_score), new_score in zip(batch, scores.tolist(), strict=True)
+        if new_score != old_score
+    ]
+    models.Bracket.objects.bulk_update(changed, ["score"])
+
+    return len(changed)
+
+
+def update_scores(
+    results: np.ndarray, simulated: SimulatedBrackets | None = None
+) -> int:
+    """
+    Rescore every saved bracket against the results.
+
+    :param simulated: Brackets simulated beforehand by :func:`simulate_brackets`.
+        Brackets created or reseeded since then are simulated again.
+    :returns: The number of brackets whose score changed.
+    """
+    simulated = simulated or SimulatedBrackets.empty()
+    changed = 0
+    batch = []
+
+    brackets = models.Bracket.objects.order_by().values_list(
+        "id", "random_seed", "score"
+    )
+    for row in brackets.iterator(chunk_size=SCORING_BATCH_SIZE):
+        batch.append(row)
+        if len(batch) == SCORING_BATCH_SIZE:
+            changed += rescore_batch(batch, results, simulated)
+            batch = []
+
+    return changed + rescore_batch(batch, results, simulated)
+
+
+def leaderboard() -> list[models.Bracket]:
+    return list(
+        models.Bracket.objects.order_by("-score", "created_at").only("name", "score")[
+            :LEADERBOARD_SIZE
+        ]
+    )
+
+
+def odds_changes(before: np.ndarray, after: np.ndarray) -> list[list]:
+    """
+    List the odds that changed as ``[round, slot, odds]`` entries.
+    """
+    before = np.round(before, ODDS_PRECISION)
+    after = np.round(after, ODDS_PRECISION)
+    rounds, slots = np.nonzero(before != after)
+
+    return [
+        [int(round), int(slot), float(after[round, slot])]
+        for round, slot in zip(rounds, slots, strict=True)
+    ]
+
+
+def record_result(game: int, winner: int) -> None:
+    """
+    Record the winner of a game, rescore brackets, and notify browsers.
+
+    :param game: The index of the game in heap order.
+    :param winner: The slot of the winning team.
+    :raises ValueError: If the winner couldn't have played in the game.
+    """
+    # Simulate brackets before taking any locks, so the transaction only has to
+    # compare picks and write scores.
+    simulated = simulate_brackets()
+
+    with transaction.atomic():
+        results = current_results()
+        validate_result(results, game, winner)
+        before = odds.advancement_odds(odds.winner_distributions(results))
+
+        models.GameResult.objects.update_or_create(
+            game=game, defaults={"winner": winner}
+        )
+        results[game] = winner
+        update_scores(results, simulated)
+
+        after = odds.advancement_odds(odds.winner_distributions(results))
+        message = {
+            "game": game,
+            "winner": winner,
+            "points": POINTS_PER_ROUND[GAME_ROUNDS[game]],
+            "leaderboard": [[bracket.name, bracket.score] for bracket in leaderboard()],
+            "odds": odds_changes(before, after),
+        }
+
+        transaction.on_commit(lambda: events.publish("result", message))
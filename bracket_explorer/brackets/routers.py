@@ -0,0 +1,98 @@
+"""
+Route read-heavy queries to database replicas.
+
+Replicas lag behind the primary, so a user who just saved a bracket could otherwise
+load a page that doesn't show it yet. Any write pins the rest of the request to the
+primary, and :class:`brackets.middleware.ReplicaPinningMiddleware` carries that pin
+over to the same client's requests for a short time afterwards.
+"""
+
+import random
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Model
+
+# Models whose reads are safe to serve from a replica. Everything else, including
+# users and sessions, always reads from the primary.
+REPLICA_MODELS = {"brackets.bracket", "brackets.gameresult", "brackets.pickcount"}
+
+
+@dataclass
+class RoutingState:
+    """
+    Routing decisions for the current request or block of code.
+    """
+
+    # Whether reads must go to the primary.
+    pinned: bool = False
+    # Whether anything has been written to the primary.
+    wrote: bool = False
+
+
+routing_state: ContextVar[RoutingState | None] = ContextVar(
+    "routing_state", default=None
+)
+
+
+@contextmanager
+def routing(state: RoutingState) -> Iterator[RoutingState]:
+    """
+    Route queries made within the block according to ``state``.
+    """
+    token = routing_state.set(state)
+    try:
+        yield state
+    finally:
+        routing_state.reset(token)
+
+
+def use_primary() -> AbstractContextManager[RoutingState]:
+    """
+    Read everything from the primary within the block.
+    """
+    return routing(RoutingState(pinned=True))
+
+
+class ReplicaRouter:
+    """
+    Send reads of :data:`REPLICA_MODELS` to a random replica and everything else to
+    the primary.
+    """
+
+    def db_for_read(self, model: type[Model], **hints) -> str:
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or model._meta.label_lower not in REPLICA_MODELS:
+            return DEFAULT_DB_ALIAS
+
+        state = routing_state.get()
+        if state is not None and state.pinned:
+            return DEFAULT_DB_ALIAS
+
+        # Reads inside a transaction need to see the transaction's own writes.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        return random.choice(replicas)
+
+    def db_for_write(self, model: type[Model], **hints) -> str:
+        state = routing_state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints) -> bool | None:
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> bool:
+        # Replicas receive schema changes through replication.
+        return db == DEFAULT_DB_ALIAS
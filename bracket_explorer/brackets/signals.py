@@ -0,0 +1,82 @@
+"""
+Keep pick counts, scores and log probabilities up to date as brackets are saved and
+deleted.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from brackets import (
+    likelihood,
+    models,
+    popularity,
+    prediction_engine,
+    results,
+    routers,
+)
+
+
+@receiver(pre_save, sender=models.Bracket)
+def remember_previous_seed(sender, instance: models.Bracket, update_fields, **kwargs):
+    """
+    Note the seed a bracket had before being changed, so its old picks can be
+    uncounted.
+    """
+    instance._previous_seed = None
+    if instance._state.adding:
+        return
+
+    if update_fields is not None and "random_seed" not in update_fields:
+        return
+
+    with routers.use_primary():
+        instance._previous_seed = (
+            models.Bracket.objects.filter(pk=instance.pk)
+            .values_list("random_seed", flat=True)
+            .first()
+        )
+
+
+def picks_changed(instance: models.Bracket) -> bool:
+    """
+    Whether a bracket being saved is new or has a new seed, and so new picks.
+    """
+    previous_seed = getattr(instance, "_previous_seed", None)
+
+    return instance._state.adding or (
+        previous_seed is not None and previous_seed != instance.random_seed
+    )
+
+
+@receiver(pre_save, sender=models.Bracket)
+def score_new_picks(sender, instance: models.Bracket, **kwargs):
+    """
+    Score new picks against the results so far and under the probability model, which
+    is otherwise only done when a result is recorded or the model changes.
+    """
+    if not picks_changed(instance):
+        return
+
+    likelihood.score_brackets([instance])
+
+    winners = prediction_engine.winner_indices(instance.predict())
+    with routers.use_primary():
+        instance.score = results.score(winners, results.current_results())
+
+
+@receiver(post_save, sender=models.Bracket)
+def count_saved_bracket(sender, instance: models.Bracket, created: bool, **kwargs):
+    if created:
+        popularity.add_brackets([instance])
+        return
+
+    if picks_changed(instance):
+        popularity.apply_changes(
+            popularity.count_picks([instance.random_seed])
+            - popularity.count_picks([instance._previous_seed])
+        )
+
+
+@receiver(post_delete, sender=models.Bracket)
+def uncount_deleted_bracket(sender, instance: models.Bracket, **kwargs):
+    popularity.remove_brackets([instance])
@@ -0,0 +1,66 @@
+// Patch the page with results pushed from the server instead of reloading it.
+(() => {
+  const source = new EventSource(document.currentScript.dataset.eventsUrl);
+
+  source.addEventListener("result", (event) => {
+    const result = JSON.parse(event.data);
+
+    updateScore(result);
+    updateLeaderboard(result.leaderboard);
+    updateOdds(result.odds);
+  });
+
+  function readJSON(id) {
+    const element = document.getElementById(id);
+
+    return element && JSON.parse(element.textContent);
+  }
+
+  const picks = readJSON("picks");
+  const results = readJSON("results");
+  const points = readJSON("game-points");
+
+  function updateScore(result) {
+    const score = document.getElementById("score");
+    if (!score || !picks) {
+      return;
+    }
+
+    // Scores are recomputed rather than incremented so corrected results are
+    // handled too.
+    results[result.game] = result.winner;
+    score.textContent = picks.reduce(
+      (total, pick, game) => total + (pick === results[game] ? points[game] : 0),
+      0,
+    );
+  }
+
+  function updateLeaderboard(entries) {
+    const leaderboard = document.getElementById("leaderboard");
+    if (!leaderboard) {
+      return;
+    }
+
+    leaderboard.replaceChildren(
+      ...entries.map(([name, score], i) => {
+        const row = document.createElement("tr");
+        for (const value of [i + 1, name, score]) {
+          const cell = document.createElement("td");
+          cell.textContent = value;
+          row.append(cell);
+        }
+
+        return row;
+      }),
+    );
+  }
+
+  function updateOdds(changes) {
+    for (const [round, slot, odds] of changes) {
+      const cell = document.querySelector(`[data-odds="${round}-${slot}"]`);
+      if (cell) {
+        cell.textContent = `${(odds * 100).toFixed(1)}%`;
+      }
+    }
+  }
+})();
@@ -1,8 +1,17 @@
-from django.urls import path
+from django.urls import path, register_converter
 
-from brackets import views
+from brackets import converters, views
+
+register_converter(converters.BracketCodeConverter, "bracket")
 
 urlpatterns = [
+    path("api/matchups/", views.matchup_odds, name="matchup-odds"),
+    path("bracket/<bracket:code>/", views.bracket_detail, name="bracket-detail"),
+    path("brackets/", views.bracket_list, name="bracket-list"),
+    path("events/", views.event_stream, name="event-stream"),
+    path("leaderboard/", views.leaderboard, name="leaderboard"),
+    path("most-likely/", views.most_likely_brackets, name="most-likely-brackets"),
+    path("popularity/", views.pick_popularity, name="pick-popularity"),
     path("prediction/", views.random_prediction, name="random-prediction"),
     path("prediction/<str:seed>/", views.bracket_prediction, name="bracket-prediction"),
 ]
@@ -1,33 +1,310 @@
 import logging
 import random
 import sys
+from functools import lru_cache
 
-from django.http import HttpRequest
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect, render
 from django.urls import reverse
-from django.views.decorators.http import require_GET
+from django.utils.safestring import SafeString
+from django.views.decorators.http import require_GET, require_http_methods
 
-from brackets import prediction_engine
+from brackets import (
+    encoding,
+    enumeration,
+    events,
+    forms,
+    models,
+    odds,
+    pagination,
+    popularity,
+    prediction_engine,
+    rendering,
+    results,
+)
 
 logger = logging.getLogger(__name__)
 
+BRACKETS_PER_PAGE = 50
+
+# Number of most likely brackets listed unless more are asked for.
+MOST_LIKELY_BRACKETS = 100
+
+# Decimal places of probabilities in API responses.
+API_PRECISION = 6
+
+# Number of decoded and rendered brackets to keep.
+BRACKET_CACHE_SIZE = 1024
+
 
 @require_GET
 def random_prediction(request: HttpRequest):
     seed = random.randrange(sys.maxsize)
+    code = encoding.encode(prediction_engine.predict(str(seed)))
 
-    return redirect(reverse("bracket-prediction", kwargs={"seed": str(seed)}))
+    return redirect(reverse("bracket-detail", kwargs={"code": code}))
 
 
 @require_GET
 def bracket_prediction(request: HttpRequest, seed: str):
+    """
+    Redirect from a random seed to the bracket it simulates.
+
+    The redirect is temporary because the bracket a seed simulates changes with the
+    probability model.
+    """
     logger.info("Simulating bracket with seed %s", seed)
-    championship = prediction_engine.build_tournament()
-    championship = prediction_engine.simulate_game(random.Random(seed), championship)
+    code = encoding.encode(prediction_engine.predict(seed))
+
+    return redirect(reverse("bracket-detail", kwargs={"code": code}))
+
+
+@lru_cache(maxsize=BRACKET_CACHE_SIZE)
+def decoded_bracket(
+    code: str,
+) -> tuple[SafeString, list[int], prediction_engine.Prediction]:
+    """
+    Decode and render a bracket. Each code always describes the same bracket, so the
+    results are cached by code.
+
+    :raises ValueError: If the code is invalid.
+    """
+    championship = encoding.decode(code)
+
+    return (
+        rendering.render_bracket(championship),
+        prediction_engine.winner_indices(championship),
+        prediction_engine.collect_results(championship),
+    )
+
+
+@require_GET
+def bracket_detail(request: HttpRequest, code: str):
+    try:
+        bracket_svg, picks, predicted_results = decoded_bracket(code)
+    except ValueError:
+        raise Http404("Invalid bracket code.")
+
+    actual_results = results.current_results()
 
     context = {
-        "results": prediction_engine.collect_results(championship),
-        "seed": seed,
+        "actual_results": actual_results.tolist(),
+        "bracket_svg": bracket_svg,
+        "code": code,
+        "game_points": results.game_points().tolist(),
+        "live_updates": live_updates(request),
+        "picks": picks,
+        "results": predicted_results,
+        "score": results.score(picks, actual_results),
     }
 
     return render(request, "brackets/bracket-detail.html", context)
+
+
+@require_http_methods(["GET", "POST"])
+@login_required
+def bracket_list(request: HttpRequest):
+    if request.method == "POST":
+        form = forms.BracketForm(request.POST)
+        if form.is_valid():
+            form.instance.owner = request.user
+            form.save()
+
+            return redirect("bracket-list")
+    else:
+        form = forms.BracketForm()
+
+    brackets = models.Bracket.objects.filter(owner=request.user).only(
+        "id", "name", "random_seed", "created_at"
+    )
+
+    try:
+        page = pagination.paginate(
+            brackets, request.GET.get(pagination.CURSOR_VAR), BRACKETS_PER_PAGE
+        )
+    except ValueError:
+        raise Http404("Invalid page cursor.")
+
+    context = {"cursor_var": pagination.CURSOR_VAR, "form": form, "page": page}
+
+    return render(request, "brackets/bracket-list.html", context)
+
+
+@require_GET
+def leaderboard(request: HttpRequest):
+    advancement = odds.advancement_odds(
+        odds.winner_distributions(results.current_results())
+    )
+    rounds = range(1, len(advancement))
+    labels = results.slot_labels()
+
+    # Teams are listed from most to least likely to win it all.
+    teams = [
+        (
+            labels[slot],
+            [(round, slot, f"{advancement[round, slot]:.1%}") for round in rounds],
+        )
+        for slot in sorted(range(len(labels)), key=lambda slot: -advancement[-1, slot])
+    ]
+
+    context = {
+        "brackets": results.leaderboard(),
+        "live_updates": live_updates(request),
+        "round_names": [
+            prediction_engine.NCAA_FORMAT.round_name(round) for round in rounds
+        ],
+        "teams": teams,
+    }
+
+    return render(request, "brackets/leaderboard.html", context)
+
+
+@require_GET
+def pick_popularity(request: HttpRequest):
+    counts = popularity.pick_counts()
+    shares = popularity.pick_shares(counts)
+    advancement = odds.advancement_odds(
+        odds.winner_distributions(results.current_results())
+    )
+    rounds = range(1, len(shares))
+    labels = results.slot_labels()
+
+    # Teams are listed from most to least popular champion pick.
+    teams = [
+        (labels[slot], [f"{shares[round, slot]:.1%}" for round in rounds])
+        for slot in sorted(range(len(labels)), key=lambda slot: -shares[-1, slot])
+    ]
+    contrarian = [
+        (
+            labels[slot],
+            prediction_engine.NCAA_FORMAT.round_name(round),
+            f"{share:.1%}",
+            f"{chance:.1%}",
+        )
+        for round, slot, share, chance in popularity.contrarian_picks(
+            shares, advancement
+        )
+    ]
+
+    context = {
+        "brackets": int(counts[-1].sum()),
+        "contrarian": contrarian,
+        "round_names": [
+            prediction_engine.NCAA_FORMAT.round_name(round) for round in rounds
+        ],
+        "teams": teams,
+    }
+
+    return render(request, "brackets/popularity.html", context)
+
+
+@require_GET
+def most_likely_brackets(request: HttpRequest):
+    try:
+        count = int(request.GET.get("count", MOST_LIKELY_BRACKETS))
+    except ValueError:
+        raise Http404("Invalid number of brackets.")
+
+    count = min(max(count, 1), enumeration.MAX_BRACKETS)
+    labels = results.slot_labels()
+
+    brackets = [
+        (bracket.code, labels[bracket.winners[0]], f"{bracket.probability:.3e}")
+        for bracket in enumeration.most_likely()[:count]
+    ]
+
+    return render(
+        request, "brackets/most-likely.html", {"brackets": brackets, "count": count}
+    )
+
+
+@require_GET
+def matchup_odds(request: HttpRequest):
+    """
+    Serve the chance of teams meeting and of each side winning, given the results so
+    far.
+
+    With ``team`` and ``opponent`` slots, only that matchup is returned. Otherwise the
+    full matrices are returned, indexed by slot in the order of ``teams``. Each pair of
+    teams can only meet in one round, which ``rounds`` gives, with 0 for a team with
+    itself.
+    """
+    matchups = odds.matchups(results.current_results())
+    labels = results.slot_labels()
+
+    team, opponent = request.GET.get("team"), request.GET.get("opponent")
+    if team is None and opponent is None:
+        return JsonResponse(
+            {
+                "model": prediction_engine.active_model.version,
+                "teams": labels,
+                "rounds": matchups.rounds.tolist(),
+                "meetings": matchups.meetings.round(API_PRECISION).tolist(),
+                "wins": matchups.wins.round(API_PRECISION).tolist(),
+            }
+        )
+
+    try:
+        team, opponent = int(team), int(opponent)
+    except (TypeError, ValueError):
+        return JsonResponse(
+            {"error": "Both team and opponent must be slot numbers."}, status=400
+        )
+
+    if not (0 <= team < len(labels) and 0 <= opponent < len(labels)):
+        return JsonResponse({"error": "Unknown team."}, status=400)
+
+    if team == opponent:
+        return JsonResponse({"error": "A team can't play itself."}, status=400)
+
+    round = int(matchups.rounds[team, opponent])
+    wins = float(matchups.wins[team, opponent])
+
+    return JsonResponse(
+        {
+            "model": prediction_engine.active_model.version,
+            "team": labels[team],
+            "opponent": labels[opponent],
+            "round": round,
+            "round_name": prediction_engine.NCAA_FORMAT.round_name(round),
+            "meeting": round_probability(matchups.meetings[team, opponent]),
+            "team_wins": round_probability(wins),
+            "opponent_wins": round_probability(1.0 - wins),
+        }
+    )
+
+
+def round_probability(probability: float) -> float:
+    return round(float(probability), API_PRECISION)
+
+
+def live_updates(request: HttpRequest) -> bool:
+    """
+    Check whether pages served for a request should follow live updates.
+
+    Event streams stay open for as long as the page does, which only asynchronous
+    workers can afford. Under WSGI, each stream would tie up a worker for good.
+    """
+    return isinstance(request, ASGIRequest)
+
+
+@require_GET
+async def event_stream(request: HttpRequest):
+    if not live_updates(request):
+        # Browsers stop reconnecting to event streams that respond with no content.
+        return HttpResponse(status=204)
+
+    return StreamingHttpResponse(
+        events.stream(),
+        content_type="text/event-stream",
+        # Proxies must pass events through as they are sent.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -40,6 +40,13 @@ manage_cmd collectstatic --no-input
 
 manage_cmd migrate --no-input
 
+# The live update broker keeps no state, and workers reconnect to it on their own,
+# so it is simply restarted.
+
+echo
+sudo systemctl restart bracket-explorer-events.service
+echo "Restarted bracket-explorer-events.service"
+
 # If the app is active, reload it to read the updated source code. If it isn't
 # active, it will read the updated source code when it starts.
 